@@ -0,0 +1,178 @@
+# SmartExam — Adaptive testing (3PL items, EAP ability on a grid, precomputed information index)
+import hashlib, heapq, math, weakref
+from array import array
+from grading import accepts, numpy
+from papers import paper_seed
+
+D = 1.702  # logistic scaling constant
+GRID = [round(-4 + 0.1*g, 1) for g in range(81)]  # ability points for the estimate and the index
+_PRIOR = [-t*t/2 for t in GRID]  # standard normal prior, log scale
+TOP_K = 64  # items kept per grid point; selection walks this list, skipping items already used
+SCALE_MEAN, SCALE_SD, SCALE_MAX = 50, 10, 100  # reported score: 50 + 10 x ability, clamped to 0..100
+
+# -----------------------------
+# 3PL item model
+# -----------------------------
+def prob(a, b, c, theta):
+    z = max(-35.0, min(35.0, D*a*(theta - b)))
+    return c + (1 - c) / (1 + math.exp(-z))
+
+def information(a, b, c, theta):
+    p = prob(a, b, c, theta)
+    return (D*a)**2 * (1 - p) / p * ((p - c) / (1 - c))**2
+
+def peak_information(a, b, c):
+    # Highest point of the item's information curve (Birnbaum); no ability gets more from it
+    return (D*a)**2 / (8*(1 - c)**2) * (1 - 20*c - 8*c*c + (1 + 8*c)**1.5)
+
+def estimate(params, correct):
+    # EAP ability and posterior SD from [(a, b, c)] and right/wrong per administered item
+    ll = list(_PRIOR)
+    for (a, b, c), ok in zip(params, correct):
+        for g, t in enumerate(GRID):
+            p = prob(a, b, c, t)
+            ll[g] += math.log(max(1e-12, p if ok else 1 - p))
+    top = max(ll)
+    w = [math.exp(x - top) for x in ll]
+    total = sum(w)
+    theta = sum(t*x for t, x in zip(GRID, w)) / total
+    return theta, math.sqrt(sum((t - theta)**2 * x for t, x in zip(GRID, w)) / total)
+
+def grid_point(theta): return max(0, min(len(GRID)-1, round((theta - GRID[0]) * 10)))
+
+def scaled_score(theta): return max(0, min(SCALE_MAX, round(SCALE_MEAN + SCALE_SD*theta)))
+
+# -----------------------------
+# Item pool: one per bank section, shared by every candidate
+# -----------------------------
+class ItemPool:
+    def __init__(self, section, params, top_k=TOP_K):
+        self.section, self.params, self.top_k = section, params, top_k
+        self.ids, self.a, self.b, self.c = params
+        if not self.ids: raise ValueError(f"{section}: no calibrated (IRT) questions for adaptive mode")
+        self.position = {item: i for i, item in enumerate(self.ids)}
+        peaks = [peak_information(*p) for p in zip(self.a, self.b, self.c)]
+        self._by_peak = sorted(range(len(self.ids)), key=peaks.__getitem__, reverse=True)
+        self._peaks = [peaks[i] for i in self._by_peak]
+        self._top = [None] * len(GRID)
+
+    def top(self, g):
+        # Pool positions ranked by information at GRID[g]; built the first time any candidate needs it
+        top = self._top[g]
+        if top is None: top = self._top[g] = self._build(GRID[g])
+        return top
+
+    def _build(self, theta):
+        k, np = min(self.top_k, len(self.ids)), numpy()
+        if np is not None:
+            a, b, c = (np.frombuffer(x, dtype=np.float64) for x in (self.a, self.b, self.c))
+            p = c + (1 - c) / (1 + np.exp(-np.clip(D*a*(theta - b), -35, 35)))
+            info = (D*a)**2 * (1 - p) / p * ((p - c) / (1 - c))**2
+            best = np.argpartition(-info, k-1)[:k]
+            return array('I', best[np.argsort(-info[best], kind='stable')].tolist())
+        # No NumPy: items in order of peak information; once the k-th best so far beats the next peak, stop
+        heap, a, b, c = [], self.a, self.b, self.c
+        for i, peak in zip(self._by_peak, self._peaks):
+            if len(heap) == k and peak <= heap[0][0]: break
+            info = information(a[i], b[i], c[i], theta)
+            if len(heap) < k: heapq.heappush(heap, (info, i))
+            elif info > heap[0][0]: heapq.heapreplace(heap, (info, i))
+        return array('I', (i for _, i in sorted(heap, reverse=True)))
+
+    def best_unused(self, theta, used):
+        # Fallback once a grid point's top list is exhausted
+        a, b, c = self.a, self.b, self.c
+        return max((i for i in range(len(self.ids)) if i not in used), key=lambda i: information(a[i], b[i], c[i], theta), default=None)
+
+_pools = weakref.WeakKeyDictionary()
+
+def item_pool(bank, section):
+    pools = _pools.setdefault(bank, {})
+    pool, params = pools.get(section), bank.irt(section)
+    if pool is None or pool.params is not params: pool = pools[section] = ItemPool(section, params)  # rebuilt after re-import
+    return pool
+
+# -----------------------------
+# Adaptive paper: drop-in for papers.Paper whose items are drawn one at a time
+# -----------------------------
+class AdaptivePaper:
+    adaptive = True
+    shuffle_options = False
+
+    def __init__(self, bank, roll, sections, exam_seed="", min_items=5, max_items=30, target_se=0.3, spread=3, items=None):
+        # spread: pick at random (seeded by roll) among this many most informative items, so strong items are not over-exposed
+        self.bank, self.roll, self.exam_seed = bank, roll, exam_seed
+        self.min_items, self.max_items, self.target_se, self.spread = min_items, max_items, target_se, spread
+        self.pools = {sec: item_pool(bank, sec) for sec in sections}
+        self.items, self._used, self.done = {}, {}, set()
+        for sec, pool in self.pools.items():
+            self.items[sec] = array('I', items[sec] if items else ())
+            self._used[sec] = {pool.position[item] for item in self.items[sec]}
+            if not items: self._draw(sec, 0.0)
+
+    @classmethod
+    def restore(cls, bank, roll, meta):
+        return cls(bank, roll, list(meta["items"]), meta["seed"], items=meta["items"], **meta["adaptive"])
+
+    def journal_meta(self):
+        # Drawn items depend on answers, so they are journaled outright rather than regenerated
+        return {"seed": self.exam_seed, "items": {sec: list(items) for sec, items in self.items.items()},
+                "adaptive": {"min_items": self.min_items, "max_items": self.max_items, "target_se": self.target_se, "spread": self.spread}}
+
+    def replay(self, sec, item):
+        # Journal recovery: an item drawn after the last snapshot
+        self.items[sec].append(item)
+        self._used[sec].add(self.pools[sec].position[item])
+
+    # Same interface as papers.Paper; options are never shuffled
+    def count(self, sec): return len(self.items[sec])
+
+    def item(self, sec, i): return self.items[sec][i]
+
+    def original_option(self, sec, i, opt): return opt
+
+    def option_counts(self, sec):
+        counts = self.bank.option_counts(sec)
+        return [counts[item] for item in self.items[sec]]
+
+    def question(self, bank, sec, i): return bank.get(sec, self.items[sec][i])
+
+    def fingerprint(self):
+        h = hashlib.sha1()
+        for sec in self.items: h.update(self.items[sec].tobytes())
+        return h.hexdigest()
+
+    # -----------------------------
+    # Estimation & selection
+    # -----------------------------
+    def estimate(self, sec, selected):
+        # Recomputed from every answer, since earlier answers can still be changed; unanswered counts as wrong
+        pool, keys = self.pools[sec], self.bank.answers(sec)
+        params = [(pool.a[p], pool.b[p], pool.c[p]) for p in map(pool.position.__getitem__, self.items[sec])]
+        return estimate(params, [accepts(keys[item], v) for item, v in zip(self.items[sec], selected)])
+
+    def advance(self, sec, selected):
+        # -> True if a new item was added; False once the section has stopped
+        if sec in self.done: return False
+        theta, se = self.estimate(sec, selected)
+        n = len(self.items[sec])
+        if n >= self.max_items or (n >= self.min_items and se <= self.target_se) or not self._draw(sec, theta):
+            self.done.add(sec)
+            return False
+        return True
+
+    def _draw(self, sec, theta):
+        pool, used = self.pools[sec], self._used[sec]
+        picks = [p for p in pool.top(grid_point(theta)) if p not in used][:self.spread]
+        if not picks:
+            best = pool.best_unused(theta, used)
+            if best is None: return False
+            picks = [best]
+        p = picks[paper_seed(self.exam_seed, f"{self.roll}\x00{sec}\x00{len(self.items[sec])}") % len(picks)]
+        self.items[sec].append(pool.ids[p])
+        used.add(p)
+        return True
+
+    def score(self, sec, selected):
+        # -> (scaled score, highest possible), the same shape ExamSession.scores() reports per section
+        return scaled_score(self.estimate(sec, selected)[0]), SCALE_MAX
@@ -0,0 +1,97 @@
+# SmartExam — Item analysis over response logs
+# python analysis.py responses/*.sxr --workers 8 --out report
+import argparse, csv, math, os, sys, time
+from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor
+from responses import iter_submissions
+
+# Per item: respondents, correct, sum/sum-of-squares of section score, sum of section score when correct
+N, CORRECT, SUM, SUMSQ, SUM_CORRECT = range(5)
+
+# -----------------------------
+# One shard per worker; memory grows with the number of items, not of submissions
+# -----------------------------
+_BITS = [tuple(bool(b >> k & 1) for k in range(8)) for b in range(256)]
+
+def analyze_shard(path):
+    items = defaultdict(dict)
+    scores = defaultdict(lambda: defaultdict(int))
+    submissions = 0
+    for _, sections in iter_submissions(path):
+        submissions += 1
+        for sec, bank_items, chosen, bits in sections:
+            correct = [ok for b in bits for ok in _BITS[b]][:len(bank_items)]
+            score = sum(correct)
+            scores[sec][score] += 1
+            sec_items, sq = items[sec], score*score
+            for item, c, ok in zip(bank_items, chosen, correct):
+                acc = sec_items.get(item)
+                if acc is None: acc = sec_items[item] = [0, 0, 0, 0, 0, {}]
+                acc[N] += 1; acc[SUM] += score; acc[SUMSQ] += sq
+                if ok: acc[CORRECT] += 1; acc[SUM_CORRECT] += score
+                opts = acc[5]; opts[c] = opts.get(c, 0) + 1
+    return submissions, {(sec, item): acc for sec, accs in items.items() for item, acc in accs.items()}, \
+        {k: dict(v) for k, v in scores.items()}
+
+def merge(results):
+    submissions, items, scores = 0, {}, defaultdict(lambda: defaultdict(int))
+    for n, shard_items, shard_scores in results:
+        submissions += n
+        for key, acc in shard_items.items():
+            total = items.get(key)
+            if total is None: items[key] = acc; continue
+            for f in range(5): total[f] += acc[f]
+            for opt, c in acc[5].items(): total[5][opt] = total[5].get(opt, 0) + c
+        for sec, hist in shard_scores.items():
+            for score, c in hist.items(): scores[sec][score] += c
+    return submissions, items, scores
+
+# -----------------------------
+# Statistics
+# -----------------------------
+def item_stats(acc):
+    n, c = acc[N], acc[CORRECT]
+    p = c / n if n else 0.0
+    # Point-biserial correlation of the item with the section score
+    var = acc[SUMSQ] / n - (acc[SUM] / n) ** 2
+    if 0 < c < n and var > 1e-12:
+        m1, m0 = acc[SUM_CORRECT] / c, (acc[SUM] - acc[SUM_CORRECT]) / (n - c)
+        r = (m1 - m0) / math.sqrt(var) * math.sqrt(p * (1 - p))
+    else:
+        r = float('nan')
+    return p, r
+
+def write_reports(out, items, scores):
+    os.makedirs(out, exist_ok=True)
+    max_opt = max((o for acc in items.values() for o in acc[5] if o >= 0), default=-1)
+    with open(os.path.join(out, "items.csv"), 'w', newline='', encoding='utf-8') as f:
+        w = csv.writer(f)
+        w.writerow(["Section", "Item", "Responses", "Difficulty", "Discrimination", "Omitted"] + [f"Option{j+1}" for j in range(max_opt+1)])
+        for (sec, item), acc in sorted(items.items()):
+            p, r = item_stats(acc)
+            w.writerow([sec, item+1, acc[N], f"{p:.4f}", "" if math.isnan(r) else f"{r:.4f}", acc[5].get(-1, 0)]
+                       + [acc[5].get(j, 0) for j in range(max_opt+1)])
+    with open(os.path.join(out, "scores.csv"), 'w', newline='', encoding='utf-8') as f:
+        w = csv.writer(f)
+        w.writerow(["Section", "Score", "Candidates"])
+        for sec in sorted(scores):
+            for score in sorted(scores[sec]): w.writerow([sec, score, scores[sec][score]])
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(prog="analysis.py")
+    ap.add_argument("shards", nargs="+", help="response log shards (.sxr)")
+    ap.add_argument("--workers", type=int, default=os.cpu_count())
+    ap.add_argument("--out", default="report")
+    args = ap.parse_args(argv)
+
+    t0 = time.perf_counter()
+    with ProcessPoolExecutor(args.workers) as pool:
+        # Largest shards first so one big day does not finish last on its own
+        shards = sorted(args.shards, key=os.path.getsize, reverse=True)
+        submissions, items, scores = merge(pool.map(analyze_shard, shards))
+    write_reports(args.out, items, scores)
+    print(f"{submissions} submissions, {len(items)} items from {len(args.shards)} shards in {time.perf_counter()-t0:.1f}s -> {args.out}/")
+    return 0
+
+if __name__=="__main__":
+    sys.exit(main())
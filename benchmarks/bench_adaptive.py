@@ -0,0 +1,58 @@
+# SmartExam — Adaptive testing: item selection latency, test length and accuracy on a large calibrated bank
+# python benchmarks/bench_adaptive.py --items 100000 --candidates 500
+import argparse, math, random, time
+from common import report, synthetic_sections
+from questionbank import QuestionBank
+from session import ExamSession
+from adaptive import AdaptivePaper, item_pool, prob
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--items", type=int, default=100000)
+    ap.add_argument("--candidates", type=int, default=500)
+    ap.add_argument("--max-items", type=int, default=30)
+    ap.add_argument("--target-se", type=float, default=0.3)
+    args = ap.parse_args()
+
+    rng = random.Random(0)
+    sections = synthetic_sections(1, args.items)
+    for q in sections["Section 1"]:
+        q["irt"] = [math.exp(rng.gauss(0, 0.3)), rng.gauss(0, 1.2), rng.uniform(0, 0.25)]
+    t0 = time.perf_counter()
+    bank = QuestionBank.from_sections(sections)
+    pool = item_pool(bank, "Section 1")
+    t1 = time.perf_counter()
+    for g in range(len(pool._top)): pool.top(g)
+    t2 = time.perf_counter()
+
+    # Simulated candidates answer each item with its 3PL probability at their true ability
+    steps, lengths, errors = [], [], []
+    for n in range(args.candidates):
+        theta = rng.gauss(0, 1)
+        paper = AdaptivePaper(bank, f"R{n}", ["Section 1"], max_items=args.max_items, target_se=args.target_se)
+        session = ExamSession(bank, paper=paper, roll=f"R{n}")
+        keys = bank.answers("Section 1")
+        while True:
+            item = paper.item("Section 1", session.current_q)
+            a, b, c = (x[pool.position[item]] for x in (pool.a, pool.b, pool.c))
+            right = rng.random() < prob(a, b, c, theta)
+            session.select(keys[item] if right else (keys[item] + 1) % 4)
+            s0 = time.perf_counter()
+            more = session.next()
+            steps.append(time.perf_counter() - s0)
+            if not more: break
+        lengths.append(session.count())
+        errors.append(paper.estimate("Section 1", session.current.selected)[0] - theta)
+    steps.sort()
+
+    rmse = math.sqrt(sum(e*e for e in errors) / len(errors))
+    report(f"{args.items:,} calibrated items, {args.candidates} simulated candidates", [
+        ("bank + pool", f"{t1-t0:.2f}s (import, peak-information order)"),
+        ("full index", f"{t2-t1:.2f}s for {len(pool._top)} grid points (built lazily in use)"),
+        ("next item", f"p50 {steps[len(steps)//2]*1000:.2f} ms, p99 {steps[int(len(steps)*0.99)]*1000:.2f} ms"),
+        ("test length", f"mean {sum(lengths)/len(lengths):.1f} items (max {args.max_items}, SE target {args.target_se})"),
+        ("ability RMSE", f"{rmse:.3f}"),
+    ])
+
+if __name__=="__main__":
+    main()
@@ -0,0 +1,56 @@
+# SmartExam — Item analysis throughput
+# python benchmarks/bench_analysis.py --shards 8 --submissions 20000 --workers 8
+import argparse, os, random, tempfile, time
+from common import synthetic_bank, report
+from analysis import analyze_shard, merge, item_stats, write_reports
+from concurrent.futures import ProcessPoolExecutor
+from papers import generate_paper
+from responses import pack_submission
+from session import ExamSession
+
+def write_shard(path, bank, n, rng, questions):
+    spec = {sec: questions for sec in bank.sections()}
+    with open(path, 'wb') as f:
+        for i in range(n):
+            s = ExamSession(bank, roll=f"{os.path.basename(path)}-{i}", paper=generate_paper(bank, f"{path}{i}", spec, "bench"))
+            ability = rng.random()
+            for sec in s.sections:
+                for q in range(s.count(sec)):
+                    s.jump(sec, q)
+                    r = rng.random()
+                    if r < 0.05: continue
+                    s.select(s.question(sec, q)["a"] if r < 0.05 + 0.9*ability else rng.randrange(4))
+            f.write(pack_submission(s))
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--shards", type=int, default=8)
+    ap.add_argument("--submissions", type=int, default=5000, help="per shard")
+    ap.add_argument("--bank", type=int, default=500, help="bank questions per section")
+    ap.add_argument("--questions", type=int, default=50, help="paper questions per section")
+    ap.add_argument("--workers", type=int, default=os.cpu_count())
+    args = ap.parse_args()
+
+    rng, tmp = random.Random(0), tempfile.mkdtemp()
+    bank = synthetic_bank(3, args.bank)
+    paths = [os.path.join(tmp, f"2026-01-{d+1:02d}.sxr") for d in range(args.shards)]
+    t0 = time.perf_counter()
+    for p in paths: write_shard(p, bank, args.submissions, rng, args.questions)
+    t1 = time.perf_counter()
+    with ProcessPoolExecutor(args.workers) as pool:
+        submissions, items, scores = merge(pool.map(analyze_shard, paths))
+    t2 = time.perf_counter()
+    write_reports(os.path.join(tmp, "report"), items, scores)
+    size = sum(os.path.getsize(p) for p in paths)
+    discr = sorted(r for r in (item_stats(a)[1] for a in items.values()) if r == r)
+
+    report(f"{submissions:,} submissions in {args.shards} shards, {args.workers} workers", [
+        ("log size", f"{size/1e6:.1f} MB ({size/submissions:.0f} bytes/submission)"),
+        ("generate logs", f"{t1-t0:.1f}s"),
+        ("analyze", f"{t2-t1:.2f}s ({submissions/(t2-t1):,.0f} submissions/s)"),
+        ("items", f"{len(items):,}, median discrimination {discr[len(discr)//2]:.3f}"),
+        ("report", os.path.join(tmp, "report")),
+    ])
+
+if __name__=="__main__":
+    main()
@@ -0,0 +1,51 @@
+# SmartExam — Bulk regrade benchmark
+# python benchmarks/bench_grading.py --candidates 100000 --negative 0.25
+import argparse, random, time
+from common import synthetic_bank, report
+from grading import AnswerKey, grade_batch, pack_responses, numpy
+from session import ExamSession
+
+def random_candidates(key, n, rng, skip=0.15):
+    return [{sec: [None if rng.random() < skip else rng.randrange(4) for _ in range(key.count(sec))]
+             for sec in key.sections} for _ in range(n)]
+
+def check(bank, key, candidates, result, correct, negative):
+    # Every candidate must match what the live exam would have saved
+    for i, c in enumerate(candidates):
+        s = ExamSession(bank)
+        for sec in s.sections:
+            s.switch_section(sec)
+            for q, v in enumerate(c[sec]):
+                s.jump(sec, q); s.select(v)
+        if s.scores(correct, negative) != result.candidate(i):
+            raise SystemExit(f"mismatch for candidate {i}")
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--candidates", type=int, default=100000)
+    ap.add_argument("--sections", type=int, default=3)
+    ap.add_argument("--questions", type=int, default=50, help="questions per section")
+    ap.add_argument("--negative", type=float, default=0)
+    ap.add_argument("--check", type=int, default=200, help="candidates cross-checked against ExamSession.scores")
+    args = ap.parse_args()
+
+    rng = random.Random(0)
+    bank = synthetic_bank(args.sections, args.questions)
+    key = AnswerKey.from_bank(bank)
+    candidates = random_candidates(key, args.candidates, rng)
+    t0 = time.perf_counter()
+    responses = pack_responses(key, candidates)
+    t1 = time.perf_counter()
+    result = grade_batch(key, responses, 1, args.negative)
+    t2 = time.perf_counter()
+    check(bank, key, candidates[:args.check], result, 1, args.negative)
+
+    report(f"{args.candidates} candidates, {args.sections}x{args.questions} questions ({'numpy' if numpy() is not None else 'pure Python'})", [
+        ("pack", f"{t1-t0:.2f}s"),
+        ("grade", f"{t2-t1:.3f}s"),
+        ("candidates/sec", f"{args.candidates/(t2-t1):,.0f}"),
+        ("cross-checked", f"{min(args.check, args.candidates)} candidates match ExamSession.scores"),
+    ])
+
+if __name__=="__main__":
+    main()
@@ -0,0 +1,46 @@
+# SmartExam — Results store import and rank lookup benchmark
+# python benchmarks/bench_rank.py --candidates 250000
+import argparse, os, random, tempfile, time
+from common import report
+from results import ResultsStore, append_rows, result_rows
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--candidates", type=int, default=250000)
+    ap.add_argument("--lookups", type=int, default=2000)
+    args = ap.parse_args()
+
+    rng = random.Random(0)
+    tmp = tempfile.mkdtemp()
+    csv_path, db_path = os.path.join(tmp, "results.csv"), os.path.join(tmp, "results.db")
+    rows = []
+    for i in range(args.candidates):
+        per = {sec: (rng.randint(0, 50), 50) for sec in ("Aptitude", "Reasoning", "Coding")}
+        rows += result_rows(f"Candidate {i}", f"R{i:07d}", per, sum(s for s, _ in per.values()), 150, 1800, now="2026-01-01 10:00:00")
+    append_rows(csv_path, rows)
+    del rows
+
+    store = ResultsStore(db_path)
+    t0 = time.perf_counter()
+    added = store.import_csv(csv_path)
+    t1 = time.perf_counter()
+    store.import_csv(csv_path)  # re-import is a no-op
+    t2 = time.perf_counter()
+    for _ in range(args.lookups):
+        store.standings({sec: (rng.randint(0, 50), 50) for sec in ("Aptitude", "Reasoning", "Coding")}, rng.randint(0, 150))
+    t3 = time.perf_counter()
+    live = [result_rows("Live", f"L{i}", {"Coding": (rng.randint(0, 50), 50)}, 0, 50, 60) for i in range(1000)]
+    t4 = time.perf_counter()
+    for r in live: store.add_rows(r)
+    t5 = time.perf_counter()
+
+    report(f"{args.candidates:,} candidates ({added:,} rows)", [
+        ("import", f"{t1-t0:.2f}s ({added/(t1-t0):,.0f} rows/s)"),
+        ("re-import", f"{t2-t1:.2f}s (duplicates ignored)"),
+        ("standings", f"{(t3-t2)/args.lookups*1000:.3f} ms per submission (4 sections)"),
+        ("live insert", f"{(t5-t4)/len(live)*1000:.3f} ms per submission"),
+        ("top overall", store.top("Overall", 1)[0]),
+    ])
+
+if __name__=="__main__":
+    main()
@@ -0,0 +1,44 @@
+# SmartExam — Shared results.csv stress test
+# python benchmarks/bench_results.py --stations 8 --submissions 5000
+import argparse, csv, multiprocessing, os, tempfile, time
+from common import report
+from results import ResultsWriter, result_rows, RESULTS_HEADER
+
+SECTIONS = {"Aptitude": (3, 5), "Reasoning": (4, 5), "Coding": (2, 5)}
+
+def station(path, station_id, submissions, fsync):
+    writer = ResultsWriter(path, fsync=fsync)
+    writer.start()
+    futures = [writer.submit(result_rows(f"Candidate {station_id}-{i}", f"{station_id}-{i}", SECTIONS, 9, 15, 600))
+               for i in range(submissions)]
+    writer.close()
+    return sum(1 for f in futures if f.exception() is None)
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--stations", type=int, default=8)
+    ap.add_argument("--submissions", type=int, default=5000, help="per station")
+    ap.add_argument("--fsync", default="interval")
+    args = ap.parse_args()
+
+    path = os.path.join(tempfile.mkdtemp(), "results.csv")
+    t0 = time.perf_counter()
+    with multiprocessing.Pool(args.stations) as pool:
+        ok = sum(pool.starmap(station, [(path, s, args.submissions, args.fsync) for s in range(args.stations)]))
+    elapsed = time.perf_counter() - t0
+
+    with open(path, newline='', encoding='utf-8') as f: rows = list(csv.reader(f))
+    assert rows[0] == RESULTS_HEADER and RESULTS_HEADER not in rows[1:], "header written more than once"
+    assert all(len(r) == len(RESULTS_HEADER) for r in rows), "interleaved or torn rows"
+    expected = args.stations * args.submissions * (len(SECTIONS) + 1)
+    assert len(rows) - 1 == expected, f"expected {expected} rows, found {len(rows)-1}"
+
+    report(f"{args.stations} stations x {args.submissions} submissions (fsync={args.fsync})", [
+        ("committed", f"{ok:,}"),
+        ("elapsed", f"{elapsed:.2f}s"),
+        ("submissions/min", f"{ok/elapsed*60:,.0f}"),
+        ("file", f"{path} ({len(rows)-1:,} rows, intact)"),
+    ])
+
+if __name__=="__main__":
+    main()
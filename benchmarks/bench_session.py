@@ -0,0 +1,54 @@
+# SmartExam — Session load simulation
+# python benchmarks/bench_session.py --candidates 5000 --questions 200
+import argparse, random, time, tracemalloc
+from common import synthetic_bank, report
+from session import ExamSession
+
+def simulate(session, rng, actions):
+    # Weighted mix of what candidates actually do on an exam screen
+    ops = 0
+    for _ in range(actions):
+        r = rng.random()
+        if r < 0.40: session.select(rng.randrange(4))
+        elif r < 0.70: session.next()
+        elif r < 0.80: session.prev()
+        elif r < 0.90: session.toggle_flag()
+        else: session.switch_section(rng.choice(session.sections))
+        ops += 1
+    session.scores()
+    return ops + 1
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--candidates", type=int, default=5000)
+    ap.add_argument("--sections", type=int, default=3)
+    ap.add_argument("--questions", type=int, default=200, help="questions per section")
+    ap.add_argument("--actions", type=int, default=300, help="actions per candidate")
+    ap.add_argument("--seed", type=int, default=0)
+    args = ap.parse_args()
+
+    bank = synthetic_bank(args.sections, args.questions)
+    bank.answers.cache_clear()
+    for sec in bank.sections(): bank.answers(sec)
+    rng = random.Random(args.seed)
+
+    tracemalloc.start()
+    base = tracemalloc.get_traced_memory()[0]
+    sessions = [ExamSession(bank, duration_seconds=1800, name=f"C{i}", roll=str(i)) for i in range(args.candidates)]
+    per_session = (tracemalloc.get_traced_memory()[0] - base) / args.candidates
+    tracemalloc.stop()
+
+    t0 = time.perf_counter()
+    ops = sum(simulate(s, rng, args.actions) for s in sessions)
+    elapsed = time.perf_counter() - t0
+
+    report(f"{args.candidates} candidates x {args.actions} actions, {args.sections}x{args.questions} questions", [
+        ("total ops", f"{ops:,}"),
+        ("elapsed", f"{elapsed:.2f}s"),
+        ("ops/sec", f"{ops/elapsed:,.0f}"),
+        ("submissions/sec", f"{args.candidates/elapsed:,.0f}"),
+        ("memory/session", f"{per_session/1024:.2f} KiB"),
+    ])
+
+if __name__=="__main__":
+    main()
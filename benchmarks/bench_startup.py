@@ -0,0 +1,53 @@
+# SmartExam — Cold start benchmark: time to first paint of the login screen, then login -> first question
+# python benchmarks/bench_startup.py --runs 10   (needs a display; headless: xvfb-run python benchmarks/bench_startup.py)
+import argparse, json, os, statistics, subprocess, sys, tempfile, time
+from common import report
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Runs in a fresh interpreter each time, so every run pays the full import cost like a rebooted kiosk
+CHILD = r"""
+import json, sys, time
+t0 = time.perf_counter()
+import smartexam
+t1 = time.perf_counter()
+app = smartexam.SmartExamApp()
+app.update()  # returns once the login screen has been drawn
+t2 = time.perf_counter()
+app.entry_name.insert(0, "Bench"); app.entry_roll.insert(0, "B1")
+app._on_start()
+app._on_section_confirm()
+app.update()
+t3 = time.perf_counter()
+app.destroy()
+print(json.dumps({"import": t1-t0, "paint": t2-t0, "first_question": t3-t2}))
+"""
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--runs", type=int, default=10)
+    args = ap.parse_args()
+
+    tmp = tempfile.mkdtemp()
+    env = dict(os.environ, SMARTEXAM_RESULTS=os.path.join(tmp, "results.csv"), SMARTEXAM_RESULTS_DB=os.path.join(tmp, "results.db"),
+               SMARTEXAM_RESPONSES=os.path.join(tmp, "responses"), SMARTEXAM_JOURNAL=os.path.join(tmp, "journal"),
+               SMARTEXAM_TELEMETRY=os.path.join(tmp, "telemetry"))
+    runs, walls = [], []
+    for _ in range(args.runs):
+        t0 = time.perf_counter()
+        proc = subprocess.run([sys.executable, "-c", CHILD], cwd=ROOT, env=env, capture_output=True, text=True)
+        walls.append(time.perf_counter() - t0)
+        if proc.returncode:
+            sys.exit(f"startup run failed (no display? try xvfb-run):\n{proc.stderr.strip().splitlines()[-1]}")
+        runs.append(json.loads(proc.stdout.strip().splitlines()[-1]))
+
+    med = lambda k: statistics.median(r[k] for r in runs) * 1000
+    report(f"cold start, median of {args.runs} runs", [
+        ("import smartexam", f"{med('import'):.1f} ms"),
+        ("login first paint", f"{med('paint'):.1f} ms after interpreter start"),
+        ("process wall", f"{statistics.median(walls)*1000:.1f} ms including interpreter start/exit"),
+        ("login -> question", f"{med('first_question'):.1f} ms (storage, bank, exam frame)"),
+    ])
+
+if __name__=="__main__":
+    main()
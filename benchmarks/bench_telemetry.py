@@ -0,0 +1,75 @@
+# SmartExam — Telemetry recorder overhead and report export benchmark
+# python benchmarks/bench_telemetry.py --events 1000000
+import argparse, os, random, tempfile, time
+from common import report, synthetic_bank
+from session import ExamSession
+from telemetry import TelemetryRecorder, timed, percentile, summarize, write_reports, NEXT, SHOW, SUBMIT
+
+class FakeApp:
+    # Just enough of SmartExamApp for the @timed handlers
+    def __init__(self, session, telemetry): self.session, self.telemetry = session, telemetry
+
+    @timed(SHOW)
+    def show(self): pass
+
+    @timed(NEXT)
+    def next(self):
+        self.session.next()
+        self.show()
+
+    def plain_next(self): self.session.next()
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--events", type=int, default=1000000)
+    ap.add_argument("--candidates", type=int, default=200)
+    args = ap.parse_args()
+
+    bank = synthetic_bank(per_section=100)
+    tmp = tempfile.mkdtemp()
+    session = ExamSession(bank, bank.sections(), 1800, "Bench", "B1")
+    rec = TelemetryRecorder(tmp)
+    rec.begin(session)
+    t0 = time.perf_counter()
+    for i in range(args.events): rec.record(SHOW, "Section 1", i % 100, 40)
+    t1 = time.perf_counter()
+    rec.close()
+
+    app = FakeApp(session, None)
+    n = args.events // 10
+    t2 = time.perf_counter()
+    for _ in range(n): session.jump("Section 1", 0); app.plain_next()
+    t3 = time.perf_counter()
+    app.telemetry = TelemetryRecorder(tmp); app.telemetry.begin(session)
+    t4 = time.perf_counter()
+    for _ in range(n): session.jump("Section 1", 0); app.next()
+    t5 = time.perf_counter()
+    app.telemetry.close()
+    size = os.path.getsize(rec.path)
+
+    # Realistic logs: a candidate browsing with revisits, seconds apart
+    rng = random.Random(0)
+    paths = []
+    for c in range(args.candidates):
+        s = ExamSession(bank, bank.sections(), 1800, f"C{c}", f"R{c}")
+        r = TelemetryRecorder(os.path.join(tmp, "logs")); r.begin(s)
+        t = 0
+        for _ in range(600):
+            t += rng.randint(1, 60) * 10**9
+            r.record(SHOW, rng.choice(s.sections), rng.randrange(100), rng.randint(200, 5000), r._t0 + t)
+        r.record(SUBMIT, s.current_section, 0, 0, r._t0 + t + 10**9)
+        r.close(); paths.append(r.path)
+    t6 = time.perf_counter()
+    dwell, visits, latency, timer = summarize(paths)
+    write_reports(os.path.join(tmp, "report"), dwell, visits, latency, timer)
+    t7 = time.perf_counter()
+
+    report(f"{args.events:,} events", [
+        ("record()", f"{(t1-t0)/args.events*1e6:.2f} µs per event ({size/1e6:.1f} MB log)"),
+        ("@timed handler", f"{((t5-t4)-(t3-t2))/n*1e6:.2f} µs added per navigation (2 events)"),
+        ("export", f"{t7-t6:.2f}s for {args.candidates} candidates, {len(dwell)} questions"),
+        ("show latency", f"p50 {percentile(latency['show'], 0.5)} µs, p99 {percentile(latency['show'], 0.99)} µs (synthetic)"),
+    ])
+
+if __name__=="__main__":
+    main()
@@ -0,0 +1,19 @@
+# SmartExam — Benchmark helpers
+import os, sys, random
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from questionbank import QuestionBank
+
+def synthetic_sections(n_sections=3, per_section=200, n_opts=4, seed=0):
+    rng = random.Random(seed)
+    return {f"Section {s+1}": [{"q": f"S{s+1} question {i+1}?", "opts": [f"option {j+1}" for j in range(n_opts)],
+                                "a": rng.randrange(n_opts)} for i in range(per_section)]
+            for s in range(n_sections)}
+
+def synthetic_bank(n_sections=3, per_section=200, n_opts=4, seed=0, path=":memory:"):
+    return QuestionBank.from_sections(synthetic_sections(n_sections, per_section, n_opts, seed), path)
+
+def report(title, rows):
+    print(title)
+    width = max(len(k) for k, _ in rows)
+    for k, v in rows: print(f"  {k:<{width}}  {v}")
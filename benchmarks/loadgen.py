@@ -0,0 +1,75 @@
+# SmartExam — Load generator for the exam server
+# python benchmarks/loadgen.py --candidates 2000            (starts a local server)
+# python benchmarks/loadgen.py --port 8765 --candidates 2000  (targets a running one)
+import argparse, asyncio, os, random, subprocess, sys, tempfile, time
+from common import report
+from server import ExamClient
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+async def candidate(i, host, port, actions, latencies, rng):
+    client = await ExamClient.connect(host, port)
+    async def timed(coro):
+        t0 = time.perf_counter()
+        resp = await coro
+        latencies.append(time.perf_counter() - t0)
+        return resp
+    try:
+        login = await timed(client.login(f"Candidate {i}", f"LG{i:06d}"))
+        sections = list(login["sections"].items())
+        for _ in range(actions):
+            sec, n = rng.choice(sections)
+            idx, r = rng.randrange(n), rng.random()
+            if r < 0.5: await timed(client.question(sec, idx))
+            elif r < 0.9: await timed(client.answer(sec, idx, rng.randrange(4)))
+            else: await timed(client.flag(sec, idx))
+        await timed(client.submit())
+    finally:
+        await client.close()
+
+async def run(args):
+    rng = random.Random(args.seed)
+    latencies, sem = [], asyncio.Semaphore(args.concurrency)
+    async def bounded(i):
+        async with sem: await candidate(i, args.host, args.port, args.actions, latencies, rng)
+    t0 = time.perf_counter()
+    await asyncio.gather(*(bounded(i) for i in range(args.candidates)))
+    return latencies, time.perf_counter() - t0
+
+def pct(sorted_values, p): return sorted_values[min(len(sorted_values)-1, int(p/100*len(sorted_values)))]
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--host", default="127.0.0.1")
+    ap.add_argument("--port", type=int, default=0, help="0 = start a local server")
+    ap.add_argument("--candidates", type=int, default=2000)
+    ap.add_argument("--concurrency", type=int, default=500, help="connections open at once")
+    ap.add_argument("--actions", type=int, default=50, help="requests per candidate before submitting")
+    ap.add_argument("--seed", type=int, default=0)
+    args = ap.parse_args()
+
+    proc = None
+    if not args.port:
+        args.port = 18765
+        tmp = tempfile.mkdtemp()  # the benchmark's results never land in the real ones
+        env = dict(os.environ, SMARTEXAM_RESULTS=os.path.join(tmp, "results.csv"), SMARTEXAM_RESULTS_DB=os.path.join(tmp, "results.db"),
+                   SMARTEXAM_RESPONSES=os.path.join(tmp, "responses"))
+        proc = subprocess.Popen([sys.executable, os.path.join(ROOT, "smartexam.py"), "--serve", "--port", str(args.port)],
+                                stdout=subprocess.PIPE, text=True, env=env, cwd=ROOT)
+        proc.stdout.readline()  # wait for "SmartExam server on ..."
+    try:
+        latencies, elapsed = asyncio.run(run(args))
+    finally:
+        if proc: proc.terminate(); proc.wait()
+    latencies.sort()
+    report(f"{args.candidates} candidates, {args.concurrency} concurrent, {args.actions} actions each", [
+        ("requests", f"{len(latencies):,}"),
+        ("elapsed", f"{elapsed:.2f}s"),
+        ("requests/sec", f"{len(latencies)/elapsed:,.0f}"),
+        ("latency p50", f"{pct(latencies, 50)*1000:.2f} ms"),
+        ("latency p99", f"{pct(latencies, 99)*1000:.2f} ms"),
+        ("latency max", f"{latencies[-1]*1000:.2f} ms"),
+    ])
+
+if __name__=="__main__":
+    main()
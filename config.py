@@ -0,0 +1,55 @@
+# SmartExam — Exam configuration and sample paper (no GUI imports, so headless tools can use it)
+import os
+
+# -----------------------------
+# Configuration
+# -----------------------------
+EXAM_DURATION_MINUTES = 30
+RESULTS_CSV = os.environ.get("SMARTEXAM_RESULTS", "results.csv")
+RESULTS_FSYNC = "interval"  # "always" | "interval" | "never"
+RESULTS_DB = os.environ.get("SMARTEXAM_RESULTS_DB", "results.db")  # indexed copy used for rank/percentile
+RESPONSES_DIR = os.environ.get("SMARTEXAM_RESPONSES", "responses")  # per-question answers for item analysis
+JOURNAL_DIR = os.environ.get("SMARTEXAM_JOURNAL", "journal")
+TELEMETRY_DIR = os.environ.get("SMARTEXAM_TELEMETRY", "telemetry")  # dwell times and UI latency; "" turns it off
+SHUFFLE_PAPERS = False  # per-candidate question subset and order, seeded by roll
+PAPER_QUESTIONS_PER_SECTION = None  # None = every question in the section
+PAPER_SEED = "SmartExam"  # change per exam sitting; same seed + roll rebuilds the same paper
+ADAPTIVE = False  # pick each question from the candidate's estimated ability; needs IRT-calibrated sections
+ADAPTIVE_MIN_ITEMS, ADAPTIVE_MAX_ITEMS = 5, 30  # per section
+ADAPTIVE_TARGET_SE = 0.3  # a section stops early once the ability estimate is this precise
+MARKS_PER_CORRECT = 1
+NEGATIVE_MARKS = 0  # deducted per wrong answer; unanswered questions score 0
+QUESTION_BANK_DB = os.environ.get("SMARTEXAM_BANK", "questions.db")
+
+SECTIONS = {
+    "Aptitude": [
+        {"q": "If 3x + 2 = 11, what is x?", "opts": ["2", "3", "9", "11"], "a": 1},
+        {"q": "What is 15% of 200?", "opts": ["20", "30", "25", "35"], "a": 1},
+        {"q": "If train A runs at 60 km/hr and B at 40 km/hr, ratio speed A:B?", "opts": ["3:2", "2:3", "6:4", "4:3"], "a": 0},
+        {"q": "What is the LCM of 6 and 8?", "opts": ["24", "48", "12", "18"], "a": 0},
+        {"q": "Solve: 7 * 8 - 5", "opts": ["51", "56", "45", "50"], "a": 0},
+    ],
+    "Reasoning": [
+        {"q": "Find the next: 2, 4, 8, 16, ?", "opts": ["20", "24", "32", "18"], "a": 2},
+        {"q": "If ALL = 3 letters, then BALL = ?", "opts": ["4", "5", "3", "2"], "a": 0},
+        {"q": "Which does not belong: Dog, Cat, Car, Cow?", "opts": ["Dog", "Cat", "Car", "Cow"], "a": 2},
+        {"q": "If A=1, B=2 then Z=?", "opts": ["26", "25", "27", "24"], "a": 0},
+        {"q": "Which is opposite of 'ascend'?", "opts": ["Rise", "Drop", "Climb", "Descend"], "a": 3},
+    ],
+    "Coding": [
+        {"q": "Which language uses 'def' to define a function?", "opts": ["Java", "C++", "Python", "Ruby"], "a": 2},
+        {"q": "What does HTML stand for?", "opts": ["Hyperlink Text Markup Language", "HyperText Markup Language", "Home Tool Markup Language", "HyperText Makeup Language"], "a": 1},
+        {"q": "Which symbol starts a single-line comment in Java?", "opts": ["//", "/*", "#", "<!--"], "a": 0},
+        {"q": "Which keyword is used to create a class in Java?", "opts": ["func", "class", "def", "new"], "a": 1},
+        {"q": "What is the output of: print(2+3*4) in Python?", "opts": ["20", "14", "10", "24"], "a": 1},
+    ]
+}
+
+# -----------------------------
+# Question bank
+# -----------------------------
+def open_question_bank(path=QUESTION_BANK_DB):
+    # External bank if present, otherwise the built-in sample paper above
+    from questionbank import QuestionBank
+    if path and os.path.isfile(path): return QuestionBank(path)
+    return QuestionBank.from_sections(SECTIONS)
@@ -0,0 +1,161 @@
+# SmartExam — Offline answer-sheet grading
+# python grade_sheets.py sheets.jsonl more.csv --out results.csv --workers 8
+#
+# JSONL: {"name": ..., "roll": ..., "answers": {"Aptitude": [1, 0, null, ...]}, "time_taken": 1200}
+#        options are 0-based like the bank's "a"; null = unanswered
+# CSV:   Name,Roll,<section>,<section>,...[,TimeTakenSeconds]
+#        one character per question: A/B/C... or 1/2/3..., and - . _ * or space = unanswered
+import argparse, csv, json, os, sqlite3, sys, time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from grading import UNANSWERED, answer_mask, score_answers
+from results import ResultsStore, _number, append_rows, result_rows
+
+BLANKS = set("-._* ")
+_keys = None  # per-worker answer keys: {section: ([mask, ...], [option count, ...])}
+
+# -----------------------------
+# Worker side
+# -----------------------------
+def _load_keys(bank_path):
+    global _keys
+    from config import open_question_bank
+    bank = open_question_bank(bank_path)
+    _keys = {sec: ([answer_mask(a) for a in bank.answers(sec)], bank.option_counts(sec)) for sec in bank.sections()}
+    bank.close()
+
+def _option(ch):
+    if ch in BLANKS: return UNANSWERED
+    if ch.isdigit() and ch != '0': return int(ch) - 1
+    if ch.isalpha(): return ord(ch.upper()) - ord('A')
+    raise ValueError(f"unreadable mark {ch!r}")
+
+def _parse_jsonl(line):
+    sheet = json.loads(line)
+    answers = {sec: [UNANSWERED if v is None else int(v) for v in opts] for sec, opts in sheet["answers"].items()}
+    return str(sheet["name"]), str(sheet["roll"]), answers, sheet.get("time_taken", 0)
+
+def _parse_csv(row, header):
+    rec = dict(zip(header, row))
+    sections = [h for h in header if h not in ("Name", "Roll", "TimeTakenSeconds")]
+    answers = {sec: [_option(ch) for ch in rec[sec]] for sec in sections if rec.get(sec)}
+    return rec["Name"], rec["Roll"], answers, rec.get("TimeTakenSeconds") or 0
+
+def grade_chunk(kind, lines, header, correct, negative, now, first_line):
+    # -> ([(line, roll, result rows)], [error])
+    graded, errors = [], []
+    records = csv.reader(lines) if kind == "csv" else lines
+    for n, rec in enumerate(records, first_line):
+        try:
+            name, roll, answers, time_taken = _parse_csv(rec, header) if kind == "csv" else _parse_jsonl(rec)
+            per_section_scores, total_score, total_questions = {}, 0, 0
+            # Same rule as ExamSession.scores(); unanswered tail questions count as unanswered
+            for sec, chosen in answers.items():
+                if sec not in _keys: raise ValueError(f"unknown section {sec!r}")
+                masks, counts = _keys[sec]
+                if len(chosen) > len(masks): raise ValueError(f"{sec}: {len(chosen)} answers for {len(masks)} questions")
+                for q, (c, options) in enumerate(zip(chosen, counts)):
+                    if not UNANSWERED <= c < options: raise ValueError(f"{sec}: question {q+1} has no option {c+1}")
+                score = score_answers(masks, chosen, correct, negative)
+                per_section_scores[sec] = (score, len(masks) * correct)
+                total_score += score
+                total_questions += len(masks) * correct
+            graded.append((n, roll, result_rows(name, roll, per_section_scores, total_score, total_questions, float(time_taken), now)))
+        except KeyError as e:
+            errors.append(f"line {n}: missing {e}")
+        except (ValueError, TypeError) as e:
+            errors.append(f"line {n}: {e}")
+    return graded, errors
+
+# -----------------------------
+# Driver: stream input in chunks, keep a bounded number of chunks in flight
+# -----------------------------
+def read_chunks(path, chunk_lines):
+    kind = "csv" if path.lower().endswith(".csv") else "jsonl"
+    with open(path, newline='' if kind == "csv" else None, encoding='utf-8') as f:
+        header, line_no = None, 1
+        if kind == "csv":
+            header = next(csv.reader([f.readline()]))
+            line_no = 2
+        chunk = []
+        for line in f:
+            if not line.strip(): line_no += 1; continue
+            chunk.append(line)
+            if len(chunk) >= chunk_lines:
+                yield kind, chunk, header, line_no
+                line_no += len(chunk); chunk = []
+        if chunk: yield kind, chunk, header, line_no
+
+def main(argv=None):
+    from config import MARKS_PER_CORRECT, NEGATIVE_MARKS, QUESTION_BANK_DB, RESULTS_CSV
+    ap = argparse.ArgumentParser(prog="grade_sheets.py")
+    ap.add_argument("inputs", nargs="+", help=".csv or .jsonl answer sheets")
+    ap.add_argument("--bank", help=f"question bank (.db); default {QUESTION_BANK_DB}, or the sample paper if that is missing")
+    ap.add_argument("--out", default=RESULTS_CSV)
+    ap.add_argument("--db", help="also add results to this results store")
+    ap.add_argument("--correct", type=_number, default=MARKS_PER_CORRECT)
+    ap.add_argument("--negative", type=_number, default=NEGATIVE_MARKS)
+    ap.add_argument("--workers", type=int, default=os.cpu_count())
+    ap.add_argument("--chunk", type=int, default=5000, help="sheets per work unit")
+    args = ap.parse_args(argv)
+    # Only the default bank may fall back to the sample paper; a bank named on the command line must exist
+    if args.bank and not os.path.isfile(args.bank): ap.error(f"question bank not found: {args.bank}")
+
+    store = ResultsStore(args.db) if args.db else None
+    now = datetime.now().isoformat(sep=' ', timespec='seconds')
+    total_bytes = sum(os.path.getsize(p) for p in args.inputs)
+    sheets = errors = done_bytes = 0
+    seen = _open_rolls()  # every row of a run shares one timestamp, so each roll may be graded once
+    t0 = last = time.perf_counter()
+    with ProcessPoolExecutor(args.workers, initializer=_load_keys, initargs=(args.bank or QUESTION_BANK_DB,)) as pool:
+        for path in args.inputs:
+            pending = []
+            for kind, lines, header, first in read_chunks(path, args.chunk):
+                pending.append((pool.submit(grade_chunk, kind, lines, header, args.correct, args.negative, now, first), sum(map(len, lines))))
+                # Bounded memory: never more than two chunks per worker waiting
+                while len(pending) >= 2 * args.workers or (pending and pending[0][0].done()):
+                    fut, size = pending.pop(0)
+                    sheets, errors = _commit(fut.result(), args.out, store, path, seen, sheets, errors)
+                    done_bytes += size
+                    if time.perf_counter() - last >= 1:
+                        last = time.perf_counter()
+                        _progress(sheets, errors, done_bytes, total_bytes, last - t0)
+            for fut, size in pending:
+                sheets, errors = _commit(fut.result(), args.out, store, path, seen, sheets, errors)
+                done_bytes += size
+    if store: store.close()
+    seen.close()
+    _progress(sheets, errors, total_bytes, total_bytes, time.perf_counter() - t0, final=True)
+    return 1 if errors else 0
+
+def _open_rolls():
+    # Rolls graded so far, in SQLite's private on-disk temp database so memory stays bounded on huge inputs
+    seen = sqlite3.connect("")
+    seen.execute("CREATE TABLE rolls (roll TEXT PRIMARY KEY, source TEXT NOT NULL) WITHOUT ROWID")
+    return seen
+
+def _commit(result, out, store, path, seen, sheets, errors):
+    graded, errs = result
+    rows = []
+    with seen:
+        for n, roll, sheet_rows in graded:
+            # A second sheet for a roll would clash with the first in the results store, so it is rejected
+            if seen.execute("INSERT OR IGNORE INTO rolls VALUES (?, ?)", (roll, f"{path} line {n}")).rowcount:
+                rows += sheet_rows; sheets += 1
+            else:
+                (first,) = seen.execute("SELECT source FROM rolls WHERE roll=?", (roll,)).fetchone()
+                errs.append(f"line {n}: roll {roll!r} was already graded from {first}")
+    if rows:
+        append_rows(out, rows)
+        if store: store.add_rows(rows)
+    for e in errs: print(f"{path}: {e}", file=sys.stderr)
+    return sheets, errors + len(errs)
+
+def _progress(sheets, errors, done, total, elapsed, final=False):
+    rate = sheets / elapsed if elapsed else 0.0
+    end = "\n" if final else "\r"
+    print(f"{sheets:,} sheets graded, {errors} rejected, {100*done/max(1, total):.0f}% "
+          f"({done/1e6/max(elapsed, 1e-9):.1f} MB/s, {rate:,.0f} sheets/s)", end=end, file=sys.stderr, flush=True)
+
+if __name__=="__main__":
+    sys.exit(main())
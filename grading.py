@@ -0,0 +1,104 @@
+# SmartExam — Grading (single candidate and vectorized bulk regrade)
+from array import array
+
+UNANSWERED = -1
+_np = False  # NumPy module once looked up; None when it is not installed
+
+def numpy():
+    # Imported on first bulk use, not with this module: the live exam imports grading at startup
+    global _np
+    if _np is False:
+        try: import numpy as _np
+        except ImportError: _np = None  # bulk grading falls back to plain Python
+    return _np
+
+# -----------------------------
+# Answer keys
+# -----------------------------
+def answer_mask(a):
+    # A key is one option index or a list of accepted indexes; packed as a bitmask
+    if isinstance(a, (list, tuple)):
+        mask = 0
+        for x in a: mask |= 1 << x
+        return mask
+    return 1 << a
+
+def accepts(a, sel):
+    return sel is not None and sel >= 0 and bool(answer_mask(a) >> sel & 1)
+
+def score_answers(masks, selected, correct=1, negative=0):
+    # Same rule for the live exam and for bulk regrades
+    right = wrong = 0
+    for mask, sel in zip(masks, selected):
+        if sel < 0: continue
+        if mask >> sel & 1: right += 1
+        else: wrong += 1
+    return right*correct - wrong*negative
+
+class AnswerKey:
+    def __init__(self, sections):
+        self.sections = list(sections)
+        self.masks = {sec: array('Q', (answer_mask(a) for a in key)) for sec, key in sections.items()}
+
+    @classmethod
+    def from_bank(cls, bank, sections=None):
+        return cls({sec: bank.answers(sec) for sec in (sections or bank.sections())})
+
+    def count(self, sec): return len(self.masks[sec])
+
+# -----------------------------
+# Bulk grading
+# -----------------------------
+class GradeResult:
+    __slots__ = ("sections", "per_section", "overall", "totals", "total_questions")
+
+    def __init__(self, sections, per_section, totals):
+        self.sections = sections
+        self.per_section = per_section
+        self.totals = totals
+        self.total_questions = sum(totals.values())
+        overall = []
+        for i, sec in enumerate(sections):
+            scores = per_section[sec]
+            if i == 0: overall = scores if hasattr(scores, "shape") else list(scores)
+            elif hasattr(overall, "shape"): overall = overall + scores
+            else: overall = [x + y for x, y in zip(overall, scores)]
+        self.overall = overall
+
+    def candidate(self, i):
+        # (per_section_scores, total_score, total_questions) — the shape _submit_exam saves
+        per = {sec: (_py(self.per_section[sec][i]), self.totals[sec]) for sec in self.sections}
+        return per, _py(self.overall[i]), self.total_questions
+
+def _py(x): return x.item() if hasattr(x, "item") else x
+
+def pack_responses(key, candidates):
+    # candidates: iterable of {section: [option or None, ...]} -> {section: n x q int8 matrix}
+    candidates = list(candidates)
+    packed, np = {}, numpy()
+    for sec in key.sections:
+        n_q = key.count(sec)
+        rows = [[UNANSWERED if v is None else v for v in c.get(sec, ())] for c in candidates]
+        rows = [r + [UNANSWERED]*(n_q - len(r)) for r in rows]
+        if np is not None: packed[sec] = np.array(rows, dtype=np.int8).reshape(len(candidates), n_q)
+        else: packed[sec] = [array('b', r) for r in rows]
+    return packed
+
+def grade_batch(key, responses, correct=1, negative=0):
+    # responses: {section: n_candidates x n_questions matrix of option indexes, -1 = unanswered}
+    per_section = {}
+    for sec in key.sections:
+        masks, sel = key.masks[sec], responses[sec]
+        if hasattr(sel, "shape"): per_section[sec] = _grade_np(masks, sel, correct, negative)
+        else: per_section[sec] = [score_answers(masks, row, correct, negative) for row in sel]
+    return GradeResult(key.sections, per_section, {sec: key.count(sec) * correct for sec in key.sections})
+
+def _grade_np(masks, sel, correct, negative):
+    np = numpy()
+    masks = np.frombuffer(masks, dtype=np.uint64) if len(masks) else np.zeros(0, dtype=np.uint64)
+    answered = sel >= 0
+    shift = np.where(answered, sel, 0).astype(np.uint64)
+    hit = ((masks[None, :] >> shift) & np.uint64(1)).astype(bool)
+    right = np.count_nonzero(answered & hit, axis=1)
+    wrong = np.count_nonzero(answered & ~hit, axis=1)
+    return right*correct - wrong*negative
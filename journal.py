@@ -0,0 +1,148 @@
+# SmartExam — Crash-recovery journal (binary event log + periodic snapshots)
+import hashlib, json, os, struct
+from array import array
+from session import ExamSession
+from papers import generate_paper
+from adaptive import AdaptivePaper
+
+ANSWER, FLAG, SECTION, TIME, DRAW = 1, 2, 3, 4, 5
+SNAPSHOT_MAGIC = b"SXS1"
+SNAPSHOT_EVERY = 4096  # records between snapshots; each snapshot truncates the log
+TIME_EVERY = 2.0  # seconds of exam time an idle candidate can win back by restarting the app
+
+# type, value, section number, question number (DRAW: bank item), seconds used so far
+_REC = struct.Struct("<BbHIf")
+_LEN = struct.Struct("<I")
+
+# -----------------------------
+# Journal
+# -----------------------------
+class ExamJournal:
+    def __init__(self, directory, roll, fsync=False):
+        key = hashlib.sha1(roll.encode('utf-8')).hexdigest()[:20]
+        self.log_path = os.path.join(directory, f"{key}.sxj")
+        self.snap_path = os.path.join(directory, f"{key}.sxs")
+        self.directory, self.fsync = directory, fsync
+        self._buf = bytearray()
+        self._file = None
+        self._records = 0
+        self._section_no = {}
+        self._logged_time = 0.0
+
+    def exists(self): return os.path.isfile(self.snap_path)
+
+    def begin(self, session):
+        os.makedirs(self.directory, exist_ok=True)
+        self._section_no = {sec: i for i, sec in enumerate(session.sections)}
+        self.snapshot(session)
+
+    # Records are only buffered here; flush() writes them in one call
+    def answer(self, session, idx, value):
+        self._append(ANSWER, -1 if value is None else value, session.current_section, idx, session)
+
+    def flag(self, session, idx, flagged):
+        self._append(FLAG, int(flagged), session.current_section, idx, session)
+
+    def section(self, session):
+        self._append(SECTION, 0, session.current_section, session.current_q, session)
+
+    def draw(self, session, sec):
+        # Adaptive items depend on the answers, so recovery cannot regenerate them; each one is logged
+        self._append(DRAW, 0, sec, session.paper.item(sec, session.count(sec)-1), session)
+
+    def _append(self, kind, value, sec, idx, session):
+        if self._file is None: return
+        self._logged_time = session.time_taken()
+        self._buf += _REC.pack(kind, value, self._section_no[sec], idx, self._logged_time)
+        self._records += 1
+
+    def flush(self, session=None):
+        # Called every timer tick: time keeps being journaled while the candidate is idle
+        if session is not None and not self._buf and session.time_taken() - self._logged_time >= TIME_EVERY:
+            self._append(TIME, 0, session.current_section, 0, session)
+        if self._file is None or not self._buf: return
+        if session is not None and self._records >= SNAPSHOT_EVERY: self.snapshot(session); return
+        self._file.write(self._buf)
+        self._buf.clear()
+        if self.fsync: os.fsync(self._file.fileno())
+
+    # -----------------------------
+    # Snapshots
+    # -----------------------------
+    def snapshot(self, session):
+        meta = {"name": session.name, "roll": session.roll, "sections": session.sections,
+                "counts": [session.count(sec) for sec in session.sections], "current": session.current_section,
+                "positions": [session.state[sec].current_q for sec in session.sections],
+                "used": session.time_taken(), "duration": session.duration_seconds,
+                "paper": session.paper and session.paper.journal_meta()}
+        head = json.dumps(meta).encode('utf-8')
+        tmp = self.snap_path + ".tmp"
+        with open(tmp, 'wb') as f:
+            f.write(SNAPSHOT_MAGIC + _LEN.pack(len(head)) + head)
+            for sec in session.sections:
+                st = session.state[sec]
+                f.write(st.selected.tobytes()); f.write(st.flagged)
+            f.flush(); os.fsync(f.fileno())
+        os.replace(tmp, self.snap_path)
+        # Replaying a record that the snapshot already covers is harmless: records carry absolute values
+        if self._file: self._file.close()
+        self._file = open(self.log_path, 'wb', buffering=0)
+        self._buf.clear()
+        self._records = 0
+        self._logged_time = meta["used"]
+
+    def close(self, discard=False):
+        if self._file:
+            if not discard: self.flush()
+            self._file.close(); self._file = None
+        if discard:
+            for p in (self.snap_path, self.log_path):
+                try: os.remove(p)
+                except FileNotFoundError: pass
+
+    # -----------------------------
+    # Recovery
+    # -----------------------------
+    def recover(self, bank):
+        # Time spent while the app was down is not charged to the candidate
+        with open(self.snap_path, 'rb') as f: data = f.read()
+        if data[:4] != SNAPSHOT_MAGIC: raise ValueError("not a SmartExam snapshot")
+        (n,) = _LEN.unpack_from(data, 4)
+        meta = json.loads(data[8:8+n])
+        if any(sec not in bank.sections() for sec in meta["sections"]): raise ValueError("section missing from question bank")
+        spec = meta.get("paper")
+        if spec and "adaptive" in spec: paper = AdaptivePaper.restore(bank, meta["roll"], spec)
+        else: paper = spec and generate_paper(bank, meta["roll"], spec["spec"], spec["seed"], spec["shuffle_options"])
+        session = ExamSession(bank, meta["sections"], meta["duration"], meta["name"], meta["roll"], paper)
+        if [session.count(sec) for sec in session.sections] != meta["counts"]:
+            raise ValueError("question bank changed since this exam started")
+        pos = 8 + n
+        for sec, q in zip(session.sections, meta["positions"]):
+            st = session.state[sec]
+            st.selected = array('b', data[pos:pos+st.count]); pos += st.count
+            st.flagged[:] = data[pos:pos+len(st.flagged)]; pos += len(st.flagged)
+            st.current_q = q
+        session.current_section = meta["current"]
+        used = meta["used"]
+        try:
+            with open(self.log_path, 'rb') as f: log = f.read()
+        except FileNotFoundError:
+            log = b""
+        usable = len(log) - len(log) % _REC.size  # a torn final record is dropped
+        for kind, value, sec_no, idx, t in _REC.iter_unpack(log[:usable]):
+            used = max(used, t)
+            if kind == TIME: continue
+            sec = session.sections[sec_no]
+            st = session.state[sec]
+            if kind == DRAW:
+                if not session.adaptive: raise ValueError("journal does not match its exam")
+                session.paper.replay(sec, idx)
+                st.grow()
+                idx = st.count - 1  # Next moves onto the item it drew
+            elif kind == ANSWER: st.selected[idx] = value
+            elif kind == FLAG: st.set_flag(idx, value)
+            st.current_q = idx
+            session.current_section = sec
+        for st in session.state.values(): st.rebuild_index()
+        session.start(remaining=max(0, session.duration_seconds - used))
+        return session
@@ -0,0 +1,128 @@
+# SmartExam — Question media: images decoded off the Tk thread, kept in a size-bounded LRU
+import base64, io, sys, threading
+import tkinter as tk
+from collections import OrderedDict, deque
+
+try:
+    from PIL import Image, ImageTk
+except ImportError:  # Tk decodes PNG/GIF itself, but on the Tk thread
+    Image = ImageTk = None
+
+QUESTION = -1  # slot of the question's own image; options use their bank option index
+
+# -----------------------------
+# Loader
+# -----------------------------
+class MediaLoader:
+    # Keys are (section, bank item, slot). The worker reads and decodes; the Tk thread only wraps
+    # ready pixels in PhotoImages, from an after() poll that runs between user events.
+    def __init__(self, root, bank, budget_bytes=64 << 20, max_size=(720, 360), poll_ms=15):
+        self.root, self.bank = root, bank
+        self.budget, self.max_size, self.poll_ms = budget_bytes, max_size, poll_ms
+        self.on_ready = None          # called on the Tk thread with each key that became ready (or failed)
+        self._cache = OrderedDict()   # key -> (PhotoImage, bytes of pixels)
+        self._failed = {}             # key -> why it cannot be shown; never read or decoded again
+        self._cost = 0
+        self._jobs = deque()
+        self._pending = set()
+        self._done = deque()
+        self._cv = threading.Condition()
+        self._poll = None
+        self._closed = False
+        self._thread = threading.Thread(target=self._run, name="media-decoder", daemon=True)
+        self._thread.start()
+
+    def slots(self, sec, item):
+        return self.bank.media_slots(sec).get(item, ())
+
+    def get(self, key):
+        # -> PhotoImage, or None while it is being decoded (on_ready fires once it is in) or if it failed
+        hit = self._cache.get(key)
+        if hit is not None:
+            self._cache.move_to_end(key)
+            return hit[0]
+        if key not in self._failed: self._queue(key, urgent=True)
+        return None
+
+    def failed(self, key): return self._failed.get(key)
+
+    def prefetch(self, keys):
+        for key in keys:
+            if key not in self._cache and key not in self._failed: self._queue(key, urgent=False)
+
+    def _queue(self, key, urgent):
+        with self._cv:
+            if key in self._pending:
+                if not urgent: return
+                try: self._jobs.remove(key)
+                except ValueError: return  # already being decoded
+            self._pending.add(key)
+            if urgent: self._jobs.appendleft(key)
+            else: self._jobs.append(key)
+            self._cv.notify()
+        if self._poll is None: self._poll = self.root.after(self.poll_ms, self._drain)
+
+    # -----------------------------
+    # Worker thread
+    # -----------------------------
+    def _run(self):
+        while True:
+            with self._cv:
+                while not self._jobs and not self._closed: self._cv.wait()
+                if self._closed: return
+                key = self._jobs.popleft()
+            try:
+                data = self.bank.media(*key)
+                self._done.append((key, self._decode(data) if data else None))
+            except Exception as e:  # a broken image must not stop the decoder
+                self._done.append((key, e))
+
+    def _decode(self, data):
+        if Image is None: return base64.b64encode(data)
+        im = Image.open(io.BytesIO(data))
+        im.draft('RGB', self.max_size)  # JPEG: decode at reduced scale when the image is much larger
+        im.thumbnail(self.max_size)
+        im.load()
+        return im.convert('RGBA' if 'A' in im.getbands() or 'transparency' in im.info else 'RGB')
+
+    # -----------------------------
+    # Tk thread
+    # -----------------------------
+    def _drain(self):
+        self._poll = None
+        # Bounded work per poll keeps each slice well under a frame; without Pillow, Tk decodes here, so one per poll
+        for _ in range(min(4 if ImageTk is not None else 1, len(self._done))):
+            key, decoded = self._done.popleft()
+            with self._cv: self._pending.discard(key)
+            try:
+                if decoded is None: raise LookupError("image file missing")
+                if isinstance(decoded, Exception): raise decoded
+                self._store(key, self._photo(decoded))
+            except Exception as e:
+                hint = " (JPEG and other formats need Pillow)" if ImageTk is None and isinstance(e, tk.TclError) else ""
+                self._failed[key] = f"{e}{hint}"
+                print(f"media {key}: {self._failed[key]}", file=sys.stderr)
+            if self.on_ready: self.on_ready(key)
+        if self._pending or self._done: self._poll = self.root.after(self.poll_ms, self._drain)
+
+    def _photo(self, decoded):
+        if ImageTk is not None: return ImageTk.PhotoImage(decoded, master=self.root)
+        photo = tk.PhotoImage(master=self.root, data=decoded)
+        w, h = photo.width(), photo.height()
+        k = max(-(-w // self.max_size[0]), -(-h // self.max_size[1]), 1)
+        return photo.subsample(k) if k > 1 else photo
+
+    def _store(self, key, photo):
+        cost = photo.width() * photo.height() * 4
+        self._cache[key] = (photo, cost)
+        self._cost += cost
+        # Widgets showing an evicted image keep their own reference (see SmartExamApp._shown_media)
+        while self._cost > self.budget and len(self._cache) > 1:
+            _, (_, c) = self._cache.popitem(last=False)
+            self._cost -= c
+
+    def close(self):
+        with self._cv:
+            self._closed = True
+            self._cv.notify()
+        if self._poll is not None: self.root.after_cancel(self._poll); self._poll = None
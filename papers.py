@@ -0,0 +1,96 @@
+# SmartExam — Per-candidate papers (stratified draw + seeded question/option shuffles)
+import hashlib, random
+from array import array
+from itertools import permutations
+
+_PERM_TABLE_MAX = 6  # precompute every ordering up to 6 options (720); shuffle beyond that
+_PERMS = {k: [bytes(p) for p in permutations(range(k))] for k in range(1, _PERM_TABLE_MAX+1)}
+_VALID = {k: frozenset(v) for k, v in _PERMS.items()}
+
+def paper_seed(exam_seed, roll):
+    # Same exam seed + roll always gives the same paper, so any paper can be rebuilt for audit
+    return int.from_bytes(hashlib.sha256(f"{exam_seed}\x00{roll}".encode('utf-8')).digest()[:8], 'little')
+
+# -----------------------------
+# Paper
+# -----------------------------
+class Paper:
+    # items: bank question numbers in display order; perms: display option -> bank option, packed per section
+    __slots__ = ("exam_seed", "roll", "spec", "shuffle_options", "items", "perms", "offsets")
+    adaptive = False
+
+    def __init__(self, exam_seed, roll, spec, shuffle_options):
+        self.exam_seed, self.roll, self.spec, self.shuffle_options = exam_seed, roll, dict(spec), shuffle_options
+        self.items, self.perms, self.offsets = {}, {}, {}
+
+    def count(self, sec): return len(self.items[sec])
+
+    def item(self, sec, i): return self.items[sec][i]
+
+    def perm(self, sec, i):
+        off = self.offsets[sec]
+        return self.perms[sec][off[i]:off[i+1]]
+
+    def original_option(self, sec, i, opt):
+        return opt if opt < 0 else self.perms[sec][self.offsets[sec][i] + opt]
+
+    def option_counts(self, sec):
+        off = self.offsets[sec]
+        return [off[i+1] - off[i] for i in range(len(off) - 1)]
+
+    def question(self, bank, sec, i):
+        q, perm = bank.get(sec, self.items[sec][i]), self.perm(sec, i)
+        a = q["a"]
+        keys = set(a) if isinstance(a, (list, tuple)) else {a}
+        shown = [j for j, p in enumerate(perm) if p in keys]
+        return {**q, "opts": [q["opts"][p] for p in perm], "a": shown[0] if len(shown) == 1 else shown}
+
+    def fingerprint(self):
+        h = hashlib.sha1()
+        for sec in self.items: h.update(self.items[sec].tobytes()); h.update(self.perms[sec])
+        return h.hexdigest()
+
+    def journal_meta(self):
+        # Papers are deterministic, so only their seed and spec are journaled
+        return {"seed": self.exam_seed, "spec": self.spec, "shuffle_options": self.shuffle_options}
+
+def generate_paper(bank, roll, spec, exam_seed="", shuffle_options=True):
+    # spec: {section: questions to draw}; None draws the whole section
+    rnd = random.Random(paper_seed(exam_seed, roll)).random  # int(rnd()*n) is much cheaper than randrange
+    paper = Paper(exam_seed, roll, spec, shuffle_options)
+    for sec, n in spec.items():
+        total = bank.count(sec)
+        n = total if n is None else min(n, total)
+        # One pick per equal-width stratum keeps coverage across the bank's topic/difficulty ordering
+        bounds = [(s*total)//n for s in range(n)] + [total]
+        items = array('I', (lo + int(rnd()*(hi-lo)) for lo, hi in zip(bounds, bounds[1:])))
+        for i in range(n-1, 0, -1):
+            j = int(rnd()*(i+1))
+            items[i], items[j] = items[j], items[i]
+        counts = bank.option_counts(sec)
+        perms, offsets = bytearray(), array('I', [0])
+        for item in items:
+            k = counts[item]
+            if not shuffle_options: perms += bytes(range(k))
+            elif k <= _PERM_TABLE_MAX: table = _PERMS[k]; perms += table[int(rnd()*len(table))]
+            else: perms += _shuffled(k, rnd)
+            offsets.append(len(perms))
+        paper.items[sec], paper.perms[sec], paper.offsets[sec] = items, bytes(perms), offsets
+    return paper
+
+def _shuffled(k, rnd):
+    p = list(range(k))
+    for i in range(k-1, 0, -1):
+        j = int(rnd()*(i+1))
+        p[i], p[j] = p[j], p[i]
+    return bytes(p)
+
+def validate_paper(bank, paper):
+    for sec, items in paper.items.items():
+        if len(set(items)) != len(items): raise ValueError(f"{sec}: repeated question")
+        if any(i >= bank.count(sec) for i in items): raise ValueError(f"{sec}: question out of range")
+        counts, perms, off = bank.option_counts(sec), paper.perms[sec], paper.offsets[sec]
+        for i, item in enumerate(items):
+            k, perm = counts[item], perms[off[i]:off[i+1]]
+            ok = perm in _VALID[k] if k <= _PERM_TABLE_MAX else bytes(sorted(perm)) == bytes(range(k))
+            if not ok: raise ValueError(f"{sec} Q{i+1}: bad option order")
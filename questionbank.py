@@ -0,0 +1,186 @@
+# SmartExam — Question Bank (SQLite, indexed by section + question number)
+import sqlite3, json, os, threading, sys
+from array import array
+from functools import lru_cache
+
+QUESTION_CACHE_SIZE = 256
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS sections (
+    id INTEGER PRIMARY KEY,
+    name TEXT NOT NULL UNIQUE,
+    position INTEGER NOT NULL,
+    count INTEGER NOT NULL DEFAULT 0
+);
+CREATE TABLE IF NOT EXISTS questions (
+    section_id INTEGER NOT NULL,
+    idx INTEGER NOT NULL,
+    q TEXT NOT NULL,
+    opts TEXT NOT NULL,
+    a NOT NULL,
+    PRIMARY KEY (section_id, idx)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS media (
+    section_id INTEGER NOT NULL,
+    idx INTEGER NOT NULL,
+    slot INTEGER NOT NULL,  -- -1: the question's image, otherwise the option it belongs to
+    data BLOB NOT NULL,
+    PRIMARY KEY (section_id, idx, slot)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS irt (
+    section_id INTEGER NOT NULL,
+    idx INTEGER NOT NULL,
+    a REAL NOT NULL,  -- discrimination
+    b REAL NOT NULL,  -- difficulty
+    c REAL NOT NULL DEFAULT 0,  -- guessing
+    PRIMARY KEY (section_id, idx)
+) WITHOUT ROWID;
+"""
+
+# -----------------------------
+# Answer keys: one option index, or a JSON list when several are accepted
+# -----------------------------
+def _encode_key(a): return json.dumps(list(a)) if isinstance(a, (list, tuple)) else a
+
+def _decode_key(a): return json.loads(a) if isinstance(a, str) else a
+
+# -----------------------------
+# Media: "img" on a question and "opt_imgs" (one entry per option, null for none) hold bytes or a file path
+# -----------------------------
+def _media_rows(sid, n, q, base_dir):
+    refs = [(-1, q.get("img"))] + list(enumerate(q.get("opt_imgs") or ()))
+    for slot, ref in refs:
+        if ref is None: continue
+        if isinstance(ref, str):
+            with open(os.path.join(base_dir, ref), 'rb') as f: ref = f.read()
+        yield sid, n, slot, bytes(ref)
+
+# -----------------------------
+# IRT calibration: "irt": [a, b] or [a, b, c] (3PL discrimination, difficulty, guessing)
+# -----------------------------
+def _irt_row(sid, n, q):
+    a, b, *c = q["irt"]
+    return sid, n, float(a), float(b), float(c[0]) if c else 0.0
+
+# -----------------------------
+# Question Bank
+# -----------------------------
+class QuestionBank:
+    def __init__(self, path=":memory:", cache_size=QUESTION_CACHE_SIZE):
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.executescript(SCHEMA)
+        self._load_sections()
+        # Per-instance caches so two banks never share entries
+        self.get = lru_cache(maxsize=cache_size)(self._fetch)
+        self.answers = lru_cache(maxsize=64)(self._fetch_answers)
+        self.option_counts = lru_cache(maxsize=64)(self._fetch_option_counts)
+        self.media_slots = lru_cache(maxsize=64)(self._fetch_media_slots)
+        self.irt = lru_cache(maxsize=64)(self._fetch_irt)
+
+    @classmethod
+    def from_sections(cls, sections, path=":memory:", **kw):
+        bank = cls(path, **kw)
+        bank.import_sections(sections)
+        return bank
+
+    def _load_sections(self):
+        with self._lock:
+            rows = self._conn.execute("SELECT id, name, count FROM sections ORDER BY position").fetchall()
+        self._section_ids = {name: sid for sid, name, _ in rows}
+        self._counts = {name: n for _, name, n in rows}
+
+    def sections(self): return list(self._counts)
+
+    def count(self, section): return self._counts[section]
+
+    def _fetch(self, section, idx):
+        with self._lock:
+            row = self._conn.execute("SELECT q, opts, a FROM questions WHERE section_id=? AND idx=?",
+                                     (self._section_ids[section], idx)).fetchone()
+        if row is None: raise IndexError(f"{section} has no question {idx}")
+        return {"q": row[0], "opts": json.loads(row[1]), "a": _decode_key(row[2])}
+
+    def _fetch_answers(self, section):
+        # Answer key only — scoring never needs question text
+        with self._lock:
+            rows = self._conn.execute("SELECT a FROM questions WHERE section_id=? ORDER BY idx",
+                                      (self._section_ids[section],)).fetchall()
+        return [_decode_key(a) for (a,) in rows]
+
+    def _fetch_option_counts(self, section):
+        with self._lock:
+            rows = self._conn.execute("SELECT json_array_length(opts) FROM questions WHERE section_id=? ORDER BY idx",
+                                      (self._section_ids[section],)).fetchall()
+        return [n for (n,) in rows]
+
+    def _fetch_media_slots(self, section):
+        # {question: slots with media}; empty for text-only sections, so the UI can skip media entirely
+        with self._lock:
+            rows = self._conn.execute("SELECT idx, slot FROM media WHERE section_id=?", (self._section_ids[section],)).fetchall()
+        slots = {}
+        for idx, slot in rows: slots.setdefault(idx, set()).add(slot)
+        return {idx: frozenset(s) for idx, s in slots.items()}
+
+    def _fetch_irt(self, section):
+        # -> (question numbers, a, b, c) for the calibrated questions of a section, as flat arrays
+        with self._lock:
+            rows = self._conn.execute("SELECT idx, a, b, c FROM irt WHERE section_id=? ORDER BY idx",
+                                      (self._section_ids[section],)).fetchall()
+        return (array('I', (r[0] for r in rows)), array('d', (r[1] for r in rows)),
+                array('d', (r[2] for r in rows)), array('d', (r[3] for r in rows)))
+
+    def media(self, section, idx, slot):
+        # Raw bytes, not cached here: the caller keeps decoded images (media.MediaLoader)
+        with self._lock:
+            row = self._conn.execute("SELECT data FROM media WHERE section_id=? AND idx=? AND slot=?",
+                                     (self._section_ids[section], idx, slot)).fetchone()
+        return row and row[0]
+
+    # -----------------------------
+    # Import
+    # -----------------------------
+    def import_sections(self, sections, base_dir="."):
+        # base_dir: where relative media paths are resolved
+        with self._lock, self._conn:
+            for name, questions in sections.items():
+                self._import_section(name, questions, base_dir)
+        for cache in (self.get, self.answers, self.option_counts, self.media_slots, self.irt): cache.cache_clear()
+        self._load_sections()
+
+    def _import_section(self, name, questions, base_dir):
+        cur = self._conn.execute("SELECT id, count FROM sections WHERE name=?", (name,)).fetchone()
+        if cur is None:
+            pos = self._conn.execute("SELECT COALESCE(MAX(position)+1, 0) FROM sections").fetchone()[0]
+            sid, start = self._conn.execute("INSERT INTO sections (name, position) VALUES (?, ?)", (name, pos)).lastrowid, 0
+        else:
+            sid, start = cur
+        rows = ((sid, n, q["q"], json.dumps(q["opts"]), _encode_key(q["a"])) for n, q in enumerate(questions, start))
+        self._conn.executemany("INSERT INTO questions (section_id, idx, q, opts, a) VALUES (?, ?, ?, ?, ?)", rows)
+        media = (row for n, q in enumerate(questions, start) if "img" in q or "opt_imgs" in q for row in _media_rows(sid, n, q, base_dir))
+        self._conn.executemany("INSERT INTO media (section_id, idx, slot, data) VALUES (?, ?, ?, ?)", media)
+        irt = (_irt_row(sid, n, q) for n, q in enumerate(questions, start) if "irt" in q)
+        self._conn.executemany("INSERT INTO irt (section_id, idx, a, b, c) VALUES (?, ?, ?, ?, ?)", irt)
+        n = self._conn.execute("SELECT COUNT(*) FROM questions WHERE section_id=?", (sid,)).fetchone()[0]
+        self._conn.execute("UPDATE sections SET count=? WHERE id=?", (n, sid))
+
+    def close(self):
+        with self._lock: self._conn.close()
+
+# -----------------------------
+# CLI: python questionbank.py bank.json questions.db
+# -----------------------------
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    if len(argv) != 2:
+        print("usage: questionbank.py SOURCE.json TARGET.db"); return 2
+    with open(argv[0], encoding='utf-8') as f: sections = json.load(f)
+    bank = QuestionBank(argv[1])
+    bank.import_sections(sections, os.path.dirname(os.path.abspath(argv[0])))
+    print(", ".join(f"{s}: {bank.count(s)}" for s in bank.sections()))
+    bank.close()
+    return 0
+
+if __name__=="__main__":
+    sys.exit(main())
@@ -0,0 +1,80 @@
+# SmartExam — Response log (per-question answers of every submission, one shard per day)
+import os, struct
+from array import array
+from datetime import date
+from grading import accepts
+from results import lock_file, unlock_file
+
+# Framing: u32 record length, then the record. A record is
+#   magic, u16 roll length + roll, u16 section count, then per section:
+#   u16 name length + name, u32 n, n x u32 bank item, n x i8 chosen bank option, ceil(n/8) correct bits
+MAGIC = b"SXR1"
+_U16, _U32 = struct.Struct("<H"), struct.Struct("<I")
+
+def _str(s):
+    b = s.encode('utf-8')
+    return _U16.pack(len(b)) + b
+
+def pack_submission(session):
+    out = bytearray(MAGIC) + _str(session.roll) + _U16.pack(len(session.sections))
+    paper = session.paper
+    for sec in session.sections:
+        st, keys = session.state[sec], session.bank.answers(sec)
+        if paper:
+            items = paper.items[sec]
+            chosen = array('b', (paper.original_option(sec, i, v) for i, v in enumerate(st.selected)))
+        else:
+            items, chosen = array('I', range(st.count)), st.selected
+        bits = bytearray((st.count + 7) >> 3)
+        for i, (item, c) in enumerate(zip(items, chosen)):
+            if accepts(keys[item], c): bits[i >> 3] |= 1 << (i & 7)
+        out += _str(sec) + _U32.pack(st.count) + items.tobytes() + chosen.tobytes() + bits
+    return _U32.pack(len(out)) + out
+
+def unpack_submission(data):
+    if data[:4] != MAGIC: raise ValueError("not a SmartExam response record")
+    pos = 4
+    (n,) = _U16.unpack_from(data, pos); roll = data[pos+2:pos+2+n].decode('utf-8'); pos += 2 + n
+    (n_sec,) = _U16.unpack_from(data, pos); pos += 2
+    sections = []
+    for _ in range(n_sec):
+        (n,) = _U16.unpack_from(data, pos); sec = data[pos+2:pos+2+n].decode('utf-8'); pos += 2 + n
+        (n,) = _U32.unpack_from(data, pos); pos += 4
+        items = array('I'); items.frombytes(data[pos:pos+4*n]); pos += 4*n
+        chosen = array('b'); chosen.frombytes(data[pos:pos+n]); pos += n
+        bits = data[pos:pos+((n+7) >> 3)]; pos += (n+7) >> 3
+        sections.append((sec, items, chosen, bits))
+    return roll, sections
+
+def iter_submissions(path):
+    # Streams one record at a time; a torn record at the end of a shard is skipped
+    with open(path, 'rb') as f:
+        while head := f.read(4):
+            if len(head) < 4: return
+            (n,) = _U32.unpack(head)
+            data = f.read(n)
+            if len(data) < n: return
+            yield unpack_submission(data)
+
+# -----------------------------
+# Writer side
+# -----------------------------
+class ResponseLog:
+    def __init__(self, directory):
+        self.directory = directory
+
+    def shard_path(self, day=None):
+        return os.path.join(self.directory, f"{(day or date.today()).isoformat()}.sxr")
+
+    def append(self, records):
+        # Called from the results writer thread with a batch of packed submissions
+        os.makedirs(self.directory, exist_ok=True)
+        if not records: return
+        with open(self.shard_path(), 'ab') as f:
+            lock_file(f)
+            try:
+                f.seek(0, os.SEEK_END)
+                f.write(b"".join(records))
+                f.flush()
+            finally:
+                unlock_file(f)
@@ -0,0 +1,247 @@
+# SmartExam — Results (queued CSV writer + indexed SQLite store for rank/percentile)
+import csv, io, os, queue, sqlite3, sys, threading, time
+from concurrent.futures import Future
+from datetime import datetime
+
+RESULTS_HEADER = ["Timestamp", "Name", "Roll", "Section", "Score", "TotalQuestions", "TimeTakenSeconds"]
+FSYNC_POLICIES = ("always", "interval", "never")
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+# -----------------------------
+# Rows & locked appends
+# -----------------------------
+def result_rows(name, roll, per_section_scores, total_score, total_questions, time_taken_seconds, now=None):
+    now = now or datetime.now().isoformat(sep=' ', timespec='seconds')
+    rows = [[now, name, roll, sec, score, total, int(time_taken_seconds)] for sec, (score, total) in per_section_scores.items()]
+    rows.append([now, name, roll, "Overall", total_score, total_questions, int(time_taken_seconds)])
+    return rows
+
+def lock_file(f):
+    if fcntl: fcntl.flock(f.fileno(), fcntl.LOCK_EX)
+    else: f.seek(0); msvcrt.locking(f.fileno(), msvcrt.LK_LOCK, 1)
+
+def unlock_file(f):
+    if fcntl: fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+    else: f.seek(0); msvcrt.locking(f.fileno(), msvcrt.LK_UNLCK, 1)
+
+def append_rows(path, rows, fsync=False):
+    # One locked write per batch: stations sharing a file never interleave rows
+    buf = io.StringIO()
+    csv.writer(buf).writerows(rows)
+    with open(path, 'a', newline='', encoding='utf-8') as f:
+        lock_file(f)
+        try:
+            f.seek(0, os.SEEK_END)
+            if f.tell() == 0: csv.writer(f).writerow(RESULTS_HEADER)
+            f.write(buf.getvalue())
+            f.flush()
+            if fsync: os.fsync(f.fileno())
+        finally:
+            unlock_file(f)
+
+# -----------------------------
+# Background writer
+# -----------------------------
+class ResultsWriter(threading.Thread):
+    def __init__(self, path, fsync="interval", fsync_interval=1.0, batch_size=512, linger=0.05, store=None, response_log=None):
+        if fsync not in FSYNC_POLICIES: raise ValueError(f"fsync must be one of {FSYNC_POLICIES}")
+        super().__init__(name="results-writer", daemon=True)
+        self.path = path
+        self.store, self.response_log = store, response_log
+        self.fsync, self.fsync_interval = fsync, fsync_interval
+        self.batch_size, self.linger = batch_size, linger
+        self._queue = queue.Queue()
+        self._last_fsync = 0.0
+        self._dirty = False
+        self._closed = False
+        self.errors = queue.Queue()
+        self.rows_written = 0
+
+    def submit(self, rows, responses=None, rank=None):
+        # responses: packed per-question record for the response log, if one is configured
+        # rank: (per_section_scores, total_score) to look up in the store on this thread, before these rows join it;
+        #       the future then resolves to those standings (None if the store could not be read) instead of the row count
+        fut = Future()
+        if self._closed: fut.set_exception(RuntimeError("results writer is closed")); return fut
+        self._queue.put((rows, responses, fut, rank))
+        return fut
+
+    def close(self, timeout=None):
+        if self._closed: return
+        self._closed = True
+        self._queue.put(None)
+        if self.is_alive(): self.join(timeout)
+
+    def run(self):
+        while True:
+            # While rows are unsynced, wake up after fsync_interval even if idle
+            try: item = self._queue.get(timeout=self.fsync_interval if self._dirty else None)
+            except queue.Empty: self._sync(); continue
+            if item is None: break
+            batch, stop = [item], False
+            deadline = time.monotonic() + self.linger
+            # Group commit: gather whatever else arrives in the linger window
+            while len(batch) < self.batch_size:
+                try: item = self._queue.get(timeout=max(0, deadline - time.monotonic()))
+                except queue.Empty: break
+                if item is None: stop = True; break
+                batch.append(item)
+            self._commit(batch)
+            if stop: break
+        self._sync()
+
+    def _commit(self, batch):
+        rows = [row for rows, _, _, _ in batch for row in rows]
+        standings = [self._standings(rank) if rank else None for _, _, _, rank in batch]
+        do_fsync = self.fsync == "always" or (self.fsync == "interval" and time.monotonic() - self._last_fsync >= self.fsync_interval)
+        try:
+            append_rows(self.path, rows, fsync=do_fsync)
+        except Exception as e:
+            self.errors.put(e)
+            for _, _, fut, _ in batch: fut.set_exception(e)
+            return
+        # The CSV is the commit point: once rows are in it the results are saved, and a retry would
+        # only duplicate them. Store and response-log failures are reported through errors; the store can be
+        # rebuilt from the CSV with `results.py import`.
+        try:
+            if self.store: self.store.add_rows(rows)
+        except Exception as e:
+            self.errors.put(e)
+        try:
+            if self.response_log: self.response_log.append([r for _, r, _, _ in batch if r])
+        except Exception as e:
+            self.errors.put(e)
+        if do_fsync: self._last_fsync, self._dirty = time.monotonic(), False
+        else: self._dirty = self.fsync != "never"
+        self.rows_written += len(rows)
+        for (rows, _, fut, rank), st in zip(batch, standings): fut.set_result(st if rank else len(rows))
+
+    def _standings(self, rank):
+        if not self.store: return None
+        try: return self.store.standings(*rank)
+        except Exception as e:
+            self.errors.put(e)
+            return None
+
+    def _sync(self):
+        if not self._dirty: return
+        try:
+            with open(self.path, 'a', encoding='utf-8') as f: os.fsync(f.fileno())
+        except Exception as e:
+            self.errors.put(e)
+        self._last_fsync, self._dirty = time.monotonic(), False
+
+# -----------------------------
+# Indexed results store
+# -----------------------------
+STORE_SCHEMA = """
+CREATE TABLE IF NOT EXISTS results (
+    ts TEXT NOT NULL,
+    name TEXT NOT NULL,
+    roll TEXT NOT NULL,
+    section TEXT NOT NULL,
+    score NUMERIC NOT NULL,
+    total INTEGER NOT NULL,
+    time_taken INTEGER NOT NULL,
+    UNIQUE (ts, roll, section)
+);
+CREATE INDEX IF NOT EXISTS results_roll ON results (roll);
+CREATE INDEX IF NOT EXISTS results_section_score ON results (section, score DESC);
+-- One row per distinct score: rank and percentile sum a few hundred rows, never millions
+CREATE TABLE IF NOT EXISTS score_counts (
+    section TEXT NOT NULL,
+    score NUMERIC NOT NULL,
+    n INTEGER NOT NULL,
+    PRIMARY KEY (section, score)
+) WITHOUT ROWID;
+"""
+
+class ResultsStore:
+    def __init__(self, path):
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(STORE_SCHEMA)
+
+    def add_rows(self, rows):
+        # rows in result_rows() / results.csv order; duplicates (same ts, roll, section) are ignored
+        with self._lock, self._conn:
+            for row in rows:
+                if self._conn.execute("INSERT OR IGNORE INTO results VALUES (?, ?, ?, ?, ?, ?, ?)", row).rowcount:
+                    self._conn.execute("INSERT INTO score_counts VALUES (?, ?, 1) ON CONFLICT (section, score) DO UPDATE SET n = n + 1",
+                                       (row[3], row[4]))
+
+    def standing(self, section, score):
+        # Rank among stored results (ties share a rank) and percentile rank as if `score` were added
+        with self._lock:
+            above, equal, n = self._conn.execute(
+                "SELECT COALESCE(SUM(CASE WHEN score > ? THEN n END), 0), COALESCE(SUM(CASE WHEN score = ? THEN n END), 0), "
+                "COALESCE(SUM(n), 0) FROM score_counts WHERE section = ?", (score, score, section)).fetchone()
+        below = n - above - equal
+        return {"rank": above + 1, "of": n + 1, "percentile": round(100 * (below + 0.5*(equal + 1)) / (n + 1), 1)}
+
+    def standings(self, per_section_scores, total_score):
+        out = {sec: self.standing(sec, score) for sec, (score, _) in per_section_scores.items()}
+        out["Overall"] = self.standing("Overall", total_score)
+        return out
+
+    def top(self, section, limit=10):
+        with self._lock:
+            return self._conn.execute("SELECT name, roll, score, total, ts FROM results WHERE section = ? "
+                                      "ORDER BY score DESC, ts LIMIT ?", (section, limit)).fetchall()
+
+    # -----------------------------
+    # Bulk import of existing results.csv files
+    # -----------------------------
+    def import_csv(self, path, chunk=20000):
+        added = 0
+        with open(path, newline='', encoding='utf-8') as f, self._lock:
+            reader = csv.reader(f)
+            if next(reader, None) != RESULTS_HEADER: raise ValueError(f"{path}: not a SmartExam results file")
+            with self._conn:
+                while True:
+                    batch = [r for _, r in zip(range(chunk), reader)]
+                    if not batch: break
+                    before = self._conn.total_changes
+                    self._conn.executemany("INSERT OR IGNORE INTO results VALUES (?, ?, ?, ?, ?, ?, ?)",
+                                           ((r[0], r[1], r[2], r[3], _number(r[4]), int(r[5]), int(r[6])) for r in batch))
+                    added += self._conn.total_changes - before
+                # Recount once instead of per row
+                self._conn.execute("DELETE FROM score_counts")
+                self._conn.execute("INSERT INTO score_counts SELECT section, score, COUNT(*) FROM results GROUP BY section, score")
+        return added
+
+    def close(self):
+        with self._lock: self._conn.close()
+
+def _number(x):
+    v = float(x)
+    return int(v) if v.is_integer() else v
+
+# -----------------------------
+# CLI: python results.py import results.csv [...] [--db results.db]
+# -----------------------------
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    db = "results.db"
+    if "--db" in argv:
+        i = argv.index("--db"); db = argv[i+1]; argv = argv[:i] + argv[i+2:]
+    if len(argv) < 2 or argv[0] != "import":
+        print("usage: results.py import RESULTS.csv [...] [--db results.db]"); return 2
+    store = ResultsStore(db)
+    for path in argv[1:]:
+        t0 = time.perf_counter()
+        added = store.import_csv(path)
+        print(f"{path}: {added} rows imported in {time.perf_counter()-t0:.1f}s")
+    store.close()
+    return 0
+
+if __name__=="__main__":
+    sys.exit(main())
@@ -0,0 +1,247 @@
+# SmartExam — Exam Server (many candidates in one asyncio process)
+# Protocol: one JSON object per line each way, {"id": n, "op": "...", ...} -> {"id": n, "ok": true, ...}
+import asyncio, heapq, json, secrets, sqlite3, sys, time
+from session import ExamSession
+from results import result_rows
+from papers import generate_paper
+from adaptive import AdaptivePaper
+from responses import pack_submission
+
+DEFAULT_HOST, DEFAULT_PORT = "127.0.0.1", 8765
+AUTO_SUBMIT_RETRY = 5.0  # seconds before a timed-out exam whose results could not be saved is tried again
+
+class ServerError(Exception): pass
+
+# -----------------------------
+# Server
+# -----------------------------
+class ExamServer:
+    def __init__(self, bank, results_writer, duration_seconds, correct=1, negative=0, paper_size=False, paper_seed="", adaptive=None):
+        # paper_size: False = bank order for everyone, None = whole bank shuffled per roll, n = n per section
+        # adaptive: AdaptivePaper settings (min_items, max_items, target_se) to draw items by ability instead
+        self.bank = bank
+        self.paper_size, self.paper_seed, self.adaptive = paper_size, paper_seed, adaptive
+        self.results_writer = results_writer
+        self.duration_seconds = duration_seconds
+        self.correct, self.negative = correct, negative
+        self.sessions, self.deadlines, self.finished = {}, {}, {}
+        self.submitting = {}  # token -> task saving its results; the session stays open until it succeeds
+        self.unsaved = {}  # token -> (result, rows, responses) scored at the first submit, written again as-is on retry
+        self._timers = []
+        self._timer_wakeup = asyncio.Event()
+        self._auto_submits = set()
+        self.requests = 0
+        self.ops = {"login": self.op_login, "question": self.op_question, "answer": self.op_answer,
+                    "flag": self.op_flag, "status": self.op_status, "submit": self.op_submit, "stats": self.op_stats}
+
+    # -----------------------------
+    # Connections
+    # -----------------------------
+    async def handle(self, reader, writer):
+        try:
+            while line := await reader.readline():
+                req = {}
+                try:
+                    req = json.loads(line)
+                    op = self.ops.get(req["op"])
+                    if op is None: raise ServerError(f"unknown op {req['op']!r}")
+                    resp = await op(req)
+                    resp["ok"] = True
+                except (ServerError, KeyError, ValueError, TypeError) as e:
+                    resp = {"ok": False, "error": str(e) if isinstance(e, ServerError) else f"bad request: {e!r}"}
+                except (OSError, sqlite3.Error) as e:
+                    resp = {"ok": False, "error": f"server error: {e}"}
+                resp["id"] = req.get("id") if isinstance(req, dict) else None
+                self.requests += 1
+                writer.write(json.dumps(resp).encode() + b"\n")
+                if writer.transport.get_write_buffer_size() > 65536: await writer.drain()
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+
+    def _session(self, req):
+        token = req["session"]
+        if token in self.finished: raise ServerError("exam already submitted")
+        if token not in self.sessions: raise ServerError("unknown session")
+        if token in self.submitting or token in self.unsaved: raise ServerError("exam is being submitted")
+        if not self.sessions[token].remaining_seconds: raise ServerError("time is up")
+        return token, self.sessions[token]
+
+    def _remaining(self, token): return self.sessions[token].remaining_seconds
+
+    # -----------------------------
+    # Operations
+    # -----------------------------
+    async def op_login(self, req):
+        name, roll = str(req["name"]).strip(), str(req["roll"]).strip()
+        if not name or not roll: raise ServerError("name and roll are required")
+        sections = req.get("sections") or self.bank.sections()
+        if any(sec not in self.bank.sections() for sec in sections): raise ServerError("unknown section")
+        token = secrets.token_hex(8)
+        paper = None
+        if self.adaptive is not None:
+            try: paper = AdaptivePaper(self.bank, roll, sections, self.paper_seed, **self.adaptive)
+            except ValueError as e: raise ServerError(str(e))
+        elif self.paper_size is not False:
+            paper = generate_paper(self.bank, roll, {sec: self.paper_size for sec in sections}, self.paper_seed)
+        session = ExamSession(self.bank, sections, self.duration_seconds, name, roll, paper)
+        session.start()
+        self.sessions[token] = session
+        self._schedule(token, session.deadline)
+        return {"session": token, "sections": {sec: session.count(sec) for sec in session.sections},
+                "adaptive": session.adaptive, "remaining": self._remaining(token)}
+
+    async def op_question(self, req):
+        token, session = self._session(req)
+        sec, idx = req["section"], int(req["index"])
+        if not session.jump(sec, idx): raise ServerError("no such question")
+        q, st = session.question(), session.current
+        # Never send the key to the client
+        return {"q": q["q"], "opts": q["opts"], "answer": st.answer(idx), "flagged": st.is_flagged(idx),
+                "remaining": self._remaining(token)}
+
+    async def op_answer(self, req):
+        token, session = self._session(req)
+        opt = req.get("option")
+        if not session.jump(req["section"], int(req["index"])): raise ServerError("no such question")
+        if opt is not None and not 0 <= int(opt) < len(session.question()["opts"]): raise ServerError("no such option")
+        session.select(None if opt is None else int(opt))
+        sec = req["section"]
+        if session.adaptive:
+            # Answering the newest item draws the next one; "count" tells the client how many there are now
+            if session.current_q == session.count(sec)-1: session.next()
+            return {"count": session.count(sec), "done": sec in session.paper.done, "remaining": self._remaining(token)}
+        return {"remaining": self._remaining(token)}
+
+    async def op_flag(self, req):
+        token, session = self._session(req)
+        if not session.jump(req["section"], int(req["index"])): raise ServerError("no such question")
+        return {"flagged": session.toggle_flag(), "remaining": self._remaining(token)}
+
+    async def op_status(self, req):
+        token, session = self._session(req)
+        return {"remaining": self._remaining(token),
+                "unanswered": {sec: session.state[sec].unanswered for sec in session.sections},
+                "flagged": [list(session.flag_at(i)) for i in range(sum(len(session.state[s].flag_order) for s in session.sections))]}
+
+    async def op_submit(self, req):
+        token = req["session"]
+        if token in self.finished: return self.finished[token]
+        if token not in self.sessions: raise ServerError("unknown session")
+        return await self._finish(token)
+
+    async def op_stats(self, req):
+        return {"active": len(self.sessions), "submitted": len(self.finished), "requests": self.requests}
+
+    # -----------------------------
+    # Submission & central timers
+    # -----------------------------
+    async def _finish(self, token, auto=False):
+        # The timer and the client can race; both wait on the same save
+        task = self.submitting.get(token)
+        if task is None:
+            task = self.submitting[token] = asyncio.ensure_future(self._save(token, auto))
+            task.add_done_callback(lambda t: self._saved(token, t))
+        return await asyncio.shield(task)
+
+    def _saved(self, token, task):
+        self.submitting.pop(token, None)
+        if not task.cancelled(): task.exception()  # already reported to whoever waited; never left unretrieved
+
+    async def _save(self, token, auto):
+        if token not in self.unsaved: self.unsaved[token] = await self._score(self.sessions[token], auto)
+        result, rows, responses = self.unsaved[token]
+        # A failed write appended nothing (the CSV is the writer's commit point), so retrying the same
+        # rows cannot duplicate them, and their one timestamp lets the store ignore a repeat
+        try: await asyncio.wrap_future(self.results_writer.submit(rows, responses))
+        except Exception as e:
+            raise ServerError(f"results could not be saved, please submit again: {e}") from e
+        # Only a saved result is final; until then the session is kept, frozen, for another try
+        del self.sessions[token], self.deadlines[token], self.unsaved[token]
+        self.finished[token] = result
+        return result
+
+    async def _score(self, session, auto):
+        per_section_scores, total_score, total_questions = session.scores(self.correct, self.negative)
+        time_taken = session.time_taken()
+        result = {"scores": {sec: list(v) for sec, v in per_section_scores.items()}, "total": total_score,
+                  "questions": total_questions, "time_taken": int(time_taken), "auto": auto}
+        store = self.results_writer.store
+        if store:
+            # The store shares its lock with the writer thread, so it is never queried on the event loop
+            try: result["standings"] = await asyncio.get_running_loop().run_in_executor(None, store.standings, per_section_scores, total_score)
+            except sqlite3.Error as e: print(f"standings unavailable: {e}", file=sys.stderr)
+        rows = result_rows(session.name, session.roll, per_section_scores, total_score, total_questions, time_taken)
+        return result, rows, pack_submission(session)
+
+    async def _auto_submit(self, token):
+        try: await self._finish(token, auto=True)
+        except ServerError as e:
+            print(f"auto-submit of session {token} failed: {e}", file=sys.stderr)
+            if token in self.sessions: self._schedule(token, time.monotonic() + AUTO_SUBMIT_RETRY)
+
+    def _schedule(self, token, deadline):
+        self.deadlines[token] = deadline
+        if not self._timers or deadline < self._timers[0][0]: self._timer_wakeup.set()
+        heapq.heappush(self._timers, (deadline, token))
+
+    async def run_timers(self):
+        # One task sleeps until the earliest deadline instead of a timer per session
+        while True:
+            now = time.monotonic()
+            while self._timers and self._timers[0][0] <= now:
+                deadline, token = heapq.heappop(self._timers)
+                if self.deadlines.get(token) != deadline: continue
+                task = asyncio.create_task(self._auto_submit(token))
+                self._auto_submits.add(task)
+                task.add_done_callback(self._auto_submits.discard)
+            self._timer_wakeup.clear()
+            timeout = self._timers[0][0] - now if self._timers else None
+            try: await asyncio.wait_for(self._timer_wakeup.wait(), timeout)
+            except asyncio.TimeoutError: pass
+
+async def serve_forever(server, host=DEFAULT_HOST, port=DEFAULT_PORT, ready=None):
+    timers = asyncio.create_task(server.run_timers())
+    listener = await asyncio.start_server(server.handle, host, port, limit=1 << 16)
+    if ready: ready(listener.sockets[0].getsockname())
+    try:
+        async with listener: await listener.serve_forever()
+    finally:
+        timers.cancel()
+
+# -----------------------------
+# Client (rendering is left to the caller)
+# -----------------------------
+class ExamClient:
+    def __init__(self, reader, writer):
+        self.reader, self.writer = reader, writer
+        self.session = None
+        self._next_id = 0
+
+    @classmethod
+    async def connect(cls, host=DEFAULT_HOST, port=DEFAULT_PORT):
+        return cls(*await asyncio.open_connection(host, port, limit=1 << 16))
+
+    async def call(self, op, **kw):
+        self._next_id += 1
+        if self.session: kw.setdefault("session", self.session)
+        self.writer.write(json.dumps({"id": self._next_id, "op": op, **kw}).encode() + b"\n")
+        resp = json.loads(await self.reader.readline())
+        if not resp.pop("ok"): raise ServerError(resp["error"])
+        return resp
+
+    async def login(self, name, roll, sections=None):
+        resp = await self.call("login", name=name, roll=roll, sections=sections)
+        self.session = resp["session"]
+        return resp
+
+    async def question(self, section, index): return await self.call("question", section=section, index=index)
+    async def answer(self, section, index, option): return await self.call("answer", section=section, index=index, option=option)
+    async def flag(self, section, index): return await self.call("flag", section=section, index=index)
+    async def status(self): return await self.call("status")
+    async def submit(self): return await self.call("submit")
+
+    async def close(self):
+        self.writer.close()
+        await self.writer.wait_closed()
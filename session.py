@@ -0,0 +1,223 @@
+# SmartExam — Exam Session (GUI-free state, navigation and scoring)
+import math, time
+from array import array
+from bisect import bisect_left, insort
+from grading import UNANSWERED, answer_mask, score_answers
+
+# -----------------------------
+# Per-section state
+# -----------------------------
+class SectionState:
+    # Answers are one signed byte per question, flags one bit per question plus a sorted index
+    __slots__ = ("count", "current_q", "selected", "flagged", "flag_order", "answered")
+
+    def __init__(self, count):
+        self.count = count
+        self.current_q = 0
+        self.selected = array('b', [UNANSWERED]) * count
+        self.flagged = bytearray((count + 7) >> 3)
+        self.flag_order = []
+        self.answered = 0
+
+    @property
+    def unanswered(self): return self.count - self.answered
+
+    def set_answer(self, i, opt):
+        v = UNANSWERED if opt is None else opt
+        self.answered += (v != UNANSWERED) - (self.selected[i] != UNANSWERED)
+        self.selected[i] = v
+
+    def answer(self, i):
+        v = self.selected[i]
+        return None if v == UNANSWERED else v
+
+    def is_flagged(self, i): return bool(self.flagged[i >> 3] & (1 << (i & 7)))
+
+    def toggle_flag(self, i):
+        self.flagged[i >> 3] ^= 1 << (i & 7)
+        if self.is_flagged(i): insort(self.flag_order, i); return True
+        del self.flag_order[bisect_left(self.flag_order, i)]
+        return False
+
+    def flagged_indices(self): return iter(self.flag_order)
+
+    def set_flag(self, i, flagged):
+        # Raw bit write; call rebuild_index() once after a batch of these
+        if flagged: self.flagged[i >> 3] |= 1 << (i & 7)
+        else: self.flagged[i >> 3] &= ~(1 << (i & 7)) & 0xff
+
+    def grow(self):
+        # Adaptive sections gain one question at a time
+        self.selected.append(UNANSWERED)
+        self.count += 1
+        if len(self.flagged) << 3 < self.count: self.flagged.append(0)
+
+    def rebuild_index(self):
+        self.answered = sum(1 for v in self.selected if v != UNANSWERED)
+        self.flag_order = [i for i in range(self.count) if self.is_flagged(i)]
+
+class SectionStates(dict):
+    # section -> SectionState, allocated the first time a section is touched
+    __slots__ = ("sections", "_count")
+
+    def __init__(self, sections, count):
+        super().__init__()
+        self.sections, self._count = frozenset(sections), count
+
+    def __contains__(self, sec): return sec in self.sections
+
+    def __missing__(self, sec):
+        if sec not in self.sections: raise KeyError(sec)
+        st = self[sec] = SectionState(self._count(sec))
+        return st
+
+# -----------------------------
+# Session
+# -----------------------------
+class ExamSession:
+    __slots__ = ("bank", "name", "roll", "sections", "current_section", "state",
+                 "duration_seconds", "start_time", "deadline", "paper")
+
+    def __init__(self, bank, sections=None, duration_seconds=0, name="", roll="", paper=None):
+        self.bank = bank
+        self.name, self.roll = name, roll
+        self.duration_seconds = duration_seconds
+        self.start_time = self.deadline = None
+        self.reset(sections or bank.sections(), paper)
+
+    def reset(self, sections, paper=None):
+        # With a paper, question i of a section is paper.item(sec, i) in the bank, options shown in paper order
+        self.paper = paper
+        self.sections = list(paper.items) if paper else list(sections)
+        self.current_section = self.sections[0]
+        self.state = SectionStates(self.sections, paper.count if paper else self.bank.count)
+        self.start_time = self.deadline = None
+
+    # -----------------------------
+    # Timing: one monotonic deadline, never decremented tick by tick
+    # -----------------------------
+    def start(self, remaining=None):
+        now = time.monotonic()
+        remaining = self.duration_seconds if remaining is None else remaining
+        self.start_time = now - (self.duration_seconds - remaining)
+        self.deadline = now + remaining
+
+    @property
+    def remaining_seconds(self):
+        if self.deadline is None: return self.duration_seconds
+        return max(0, math.ceil(self.deadline - time.monotonic()))
+
+    def time_taken(self):
+        if self.start_time is None: return 0
+        return min(time.monotonic(), self.deadline) - self.start_time
+
+    # -----------------------------
+    # Questions
+    # -----------------------------
+    @property
+    def current(self): return self.state[self.current_section]
+
+    @property
+    def current_q(self): return self.current.current_q
+
+    def count(self, sec=None): return self.state[sec or self.current_section].count
+
+    def option_counts(self, sec):
+        return self.paper.option_counts(sec) if self.paper else self.bank.option_counts(sec)
+
+    def question(self, sec=None, idx=None):
+        sec = sec or self.current_section
+        idx = self.state[sec].current_q if idx is None else idx
+        return self.paper.question(self.bank, sec, idx) if self.paper else self.bank.get(sec, idx)
+
+    def bank_item(self, sec, idx): return self.paper.item(sec, idx) if self.paper else idx
+
+    def bank_option(self, sec, idx, opt): return self.paper.original_option(sec, idx, opt) if self.paper else opt
+
+    # -----------------------------
+    # Navigation & answers
+    # -----------------------------
+    def select(self, opt):
+        st = self.current
+        st.set_answer(st.current_q, opt)
+
+    def next(self):
+        st = self.current
+        if st.current_q >= st.count-1 and not self._administer(): return False
+        st.current_q += 1
+        return True
+
+    def _administer(self):
+        # Adaptive papers: the next item is drawn once the last one drawn has been answered
+        st = self.current
+        if not (self.paper and self.paper.adaptive) or st.selected[st.current_q] == UNANSWERED: return False
+        if not self.paper.advance(self.current_section, st.selected): return False
+        st.grow()
+        return True
+
+    @property
+    def adaptive(self): return bool(self.paper and self.paper.adaptive)
+
+    def prev(self):
+        st = self.current
+        if st.current_q <= 0: return False
+        st.current_q -= 1
+        return True
+
+    def jump(self, sec, idx):
+        if sec not in self.state or not 0 <= idx < self.state[sec].count: return False
+        self.current_section = sec
+        self.state[sec].current_q = idx
+        return True
+
+    def switch_section(self, sec):
+        if sec not in self.state: return False
+        self.current_section = sec
+        return True
+
+    def toggle_flag(self):
+        st = self.current
+        return st.toggle_flag(st.current_q)
+
+    # -----------------------------
+    # Flagged index: position across sections, in section order then question order
+    # -----------------------------
+    def flag_position(self, sec, idx):
+        pos = 0
+        for s in self.sections:
+            if s == sec: return pos + bisect_left(self.state[s].flag_order, idx)
+            pos += len(self.state[s].flag_order)
+        raise KeyError(sec)
+
+    def flag_at(self, pos):
+        for s in self.sections:
+            order = self.state[s].flag_order
+            if pos < len(order): return s, order[pos]
+            pos -= len(order)
+        raise IndexError(pos)
+
+    # -----------------------------
+    # Scoring
+    # -----------------------------
+    def scores(self, correct=1, negative=0):
+        # -> ({section: (score, out of)}, total score, total out of); out of is the most marks a section can give
+        per_section_scores = {}
+        total_score, total_questions = 0, 0
+        for sec in self.sections:
+            keys, selected = self.bank.answers(sec), self.state[sec].selected
+            if self.adaptive:
+                # Number right is not comparable across different items; report the scaled ability instead
+                score, out_of = self.paper.score(sec, selected)
+                per_section_scores[sec] = (score, out_of)
+                total_score += score
+                total_questions += out_of
+                continue
+            if self.paper:
+                # Score in bank terms: map each item and each chosen option back through the paper
+                keys = [keys[item] for item in self.paper.items[sec]]
+                selected = [self.paper.original_option(sec, i, v) for i, v in enumerate(selected)]
+            score = score_answers([answer_mask(a) for a in keys], selected, correct, negative)
+            per_section_scores[sec] = (score, self.state[sec].count * correct)
+            total_score += score
+            total_questions += self.state[sec].count * correct
+        return per_section_scores, total_score, total_questions
@@ -1,62 +1,87 @@
 # SmartExam — Full Multi-Section Exam Simulator (Part 1)
 import tkinter as tk
 from tkinter import ttk, messagebox
-import csv, os, time
-from datetime import datetime
+import math, time
+from array import array
+from bisect import bisect_right
+from session import ExamSession
+from grading import accepts
+from config import (EXAM_DURATION_MINUTES, RESULTS_CSV, RESULTS_FSYNC, RESULTS_DB, RESPONSES_DIR, JOURNAL_DIR, TELEMETRY_DIR,
+                    SHUFFLE_PAPERS, PAPER_QUESTIONS_PER_SECTION, PAPER_SEED, ADAPTIVE, ADAPTIVE_MIN_ITEMS, ADAPTIVE_MAX_ITEMS,
+                    ADAPTIVE_TARGET_SE, MARKS_PER_CORRECT, NEGATIVE_MARKS, open_question_bank)
+# Storage, journal and paper modules are imported on first use, so the login screen paints without them
+from telemetry import TelemetryRecorder, timed, NEXT, PREV, FLAG, SECTION, SHOW, TICK, SUBMIT
 
 # -----------------------------
 # Configuration
 # -----------------------------
 APP_TITLE = "SmartExam - Multi-Section"
-EXAM_DURATION_MINUTES = 30
-RESULTS_CSV = "results.csv"
-
-SECTIONS = {
-    "Aptitude": [
-        {"q": "If 3x + 2 = 11, what is x?", "opts": ["2", "3", "9", "11"], "a": 1},
-        {"q": "What is 15% of 200?", "opts": ["20", "30", "25", "35"], "a": 1},
-        {"q": "If train A runs at 60 km/hr and B at 40 km/hr, ratio speed A:B?", "opts": ["3:2", "2:3", "6:4", "4:3"], "a": 0},
-        {"q": "What is the LCM of 6 and 8?", "opts": ["24", "48", "12", "18"], "a": 0},
-        {"q": "Solve: 7 * 8 - 5", "opts": ["51", "56", "45", "50"], "a": 0},
-    ],
-    "Reasoning": [
-        {"q": "Find the next: 2, 4, 8, 16, ?", "opts": ["20", "24", "32", "18"], "a": 2},
-        {"q": "If ALL = 3 letters, then BALL = ?", "opts": ["4", "5", "3", "2"], "a": 0},
-        {"q": "Which does not belong: Dog, Cat, Car, Cow?", "opts": ["Dog", "Cat", "Car", "Cow"], "a": 2},
-        {"q": "If A=1, B=2 then Z=?", "opts": ["26", "25", "27", "24"], "a": 0},
-        {"q": "Which is opposite of 'ascend'?", "opts": ["Rise", "Drop", "Climb", "Descend"], "a": 3},
-    ],
-    "Coding": [
-        {"q": "Which language uses 'def' to define a function?", "opts": ["Java", "C++", "Python", "Ruby"], "a": 2},
-        {"q": "What does HTML stand for?", "opts": ["Hyperlink Text Markup Language", "HyperText Markup Language", "Home Tool Markup Language", "HyperText Makeup Language"], "a": 1},
-        {"q": "Which symbol starts a single-line comment in Java?", "opts": ["//", "/*", "#", "<!--"], "a": 0},
-        {"q": "Which keyword is used to create a class in Java?", "opts": ["func", "class", "def", "new"], "a": 1},
-        {"q": "What is the output of: print(2+3*4) in Python?", "opts": ["20", "14", "10", "24"], "a": 1},
-    ]
-}
+REVIEW_ROW_HEIGHT = 24
+MEDIA_CACHE_MB = 64  # decoded question/option images kept in memory
+MEDIA_MAX_SIZE = (720, 360)  # images are scaled down to fit, off the Tk thread
+
+# -----------------------------
+# Papers
+# -----------------------------
+def make_paper(bank, roll, sections):
+    if ADAPTIVE:
+        from adaptive import AdaptivePaper
+        return AdaptivePaper(bank, roll, sections, PAPER_SEED, ADAPTIVE_MIN_ITEMS, ADAPTIVE_MAX_ITEMS, ADAPTIVE_TARGET_SE)
+    if not SHUFFLE_PAPERS: return None
+    from papers import generate_paper
+    return generate_paper(bank, roll, {sec: PAPER_QUESTIONS_PER_SECTION for sec in sections}, PAPER_SEED)
 
 # -----------------------------
 # CSV saving
 # -----------------------------
-def save_results_csv(name, roll, per_section_scores, total_score, total_questions, time_taken_seconds):
-    header = ["Timestamp", "Name", "Roll", "Section", "Score", "TotalQuestions", "TimeTakenSeconds"]
-    now = datetime.now().isoformat(sep=' ', timespec='seconds')
-    file_exists = os.path.isfile(RESULTS_CSV)
-    try:
-        with open(RESULTS_CSV, 'a', newline='', encoding='utf-8') as f:
-            writer = csv.writer(f)
-            if not file_exists: writer.writerow(header)
-            for sec, (score, total) in per_section_scores.items():
-                writer.writerow([now, name, roll, sec, score, total, int(time_taken_seconds)])
-            writer.writerow([now, name, roll, "Overall", total_score, total_questions, int(time_taken_seconds)])
-    except Exception as e:
-        print("Failed to save CSV:", e)
+def save_results_csv(name, roll, per_section_scores, total_score, total_questions, time_taken_seconds, path=RESULTS_CSV):
+    # Synchronous, locked append; the app itself goes through ResultsWriter
+    from results import append_rows, result_rows
+    append_rows(path, result_rows(name, roll, per_section_scores, total_score, total_questions, time_taken_seconds))
+
+# -----------------------------
+# Review rows: section header, then one row per question and per option
+# -----------------------------
+class ReviewRows:
+    def __init__(self, session):
+        self.sections = list(session.sections)
+        self.section_starts = array('I')
+        self.question_starts = {}
+        row = 0
+        for sec in self.sections:
+            self.section_starts.append(row)
+            row += 1
+            starts = self.question_starts[sec] = array('I')
+            for n in session.option_counts(sec):
+                starts.append(row)
+                row += 1 + n
+        self.total = row
+
+    def fits(self, session):
+        # Adaptive sections grow as the exam goes, so the layout is only good for the counts it was built from
+        return self.sections == session.sections and all(len(self.question_starts[sec]) == session.count(sec) for sec in self.sections)
+
+    def locate(self, row):
+        # -> (section, question or None, option or None)
+        s = bisect_right(self.section_starts, row) - 1
+        sec = self.sections[s]
+        if row == self.section_starts[s]: return sec, None, None
+        starts = self.question_starts[sec]
+        i = bisect_right(starts, row) - 1
+        off = row - starts[i]
+        return sec, i, (off-1 if off else None)
+
+    def question_rows(self, sec, i):
+        starts = self.question_starts[sec]
+        end = starts[i+1] if i+1 < len(starts) else (self.section_starts[self.sections.index(sec)+1]
+                                                     if sec != self.sections[-1] else self.total)
+        return range(starts[i], end)
 
 # -----------------------------
 # Main App
 # -----------------------------
 class SmartExamApp(tk.Tk):
-    def __init__(self):
+    def __init__(self, bank=None):
         super().__init__()
         self.title(APP_TITLE)
         self.state("zoomed")
@@ -68,23 +93,36 @@ class SmartExamApp(tk.Tk):
         except: pass
         self._setup_styles()
 
-        # State
-        self.student_name, self.student_roll = "", ""
-        self.duration_seconds = EXAM_DURATION_MINUTES*60
-        self.remaining_seconds = self.duration_seconds
+        # State: bank, session and results storage are opened at login (_open_storage)
+        self.bank = bank
+        self.session = None
         self.timer_job = None
-        self.start_time = None
-        self.sections = list(SECTIONS.keys())
-        self.current_section = self.sections[0]
-        self.section_state = {sec: {"current_q":0, "selected":[None]*len(SECTIONS[sec]), "flagged":[False]*len(SECTIONS[sec])} for sec in self.sections}
-
-        # Build UI frames
-        self._build_login_frame()
-        self._build_section_select_frame()
-        self._build_exam_frame()
-        self._build_review_frame()
+        self._tick_due, self._shown_remaining = None, None
+        self.journal = None
+        self.telemetry = TelemetryRecorder(TELEMETRY_DIR) if TELEMETRY_DIR else None
+        self.results_store = self.results_writer = None
+        self.media, self._shown_media, self._media_item = None, [], None
+        self.review_pool, self.review_rows, self.review_top = [], None, 0
+
+        # UI frames are built by show_frame the first time each one is shown
         self.show_frame('login')
 
+    def _open_storage(self):
+        if self.results_writer is not None: return
+        from results import ResultsWriter, ResultsStore
+        from responses import ResponseLog
+        self.bank = self.bank or open_question_bank()
+        self.session = ExamSession(self.bank, duration_seconds=EXAM_DURATION_MINUTES*60)
+        self.results_store = ResultsStore(RESULTS_DB)
+        self.results_writer = ResultsWriter(RESULTS_CSV, fsync=RESULTS_FSYNC, store=self.results_store,
+                                            response_log=ResponseLog(RESPONSES_DIR))
+        self.results_writer.start()
+        # Text-only banks never start the decoder
+        if any(self.bank.media_slots(sec) for sec in self.bank.sections()):
+            from media import MediaLoader
+            self.media = MediaLoader(self, self.bank, MEDIA_CACHE_MB << 20, MEDIA_MAX_SIZE)
+            self.media.on_ready = self._media_ready
+
     # -----------------------------
     # Styles
     # -----------------------------
@@ -133,7 +171,7 @@ class SmartExamApp(tk.Tk):
         card.pack(fill='both', expand=True)
         ttk.Label(card, text="Choose sections to take (default: all):", font=('Segoe UI', 11)).pack(anchor='w', pady=(4,6))
         self.section_vars = {}
-        for sec in self.sections:
+        for sec in self.bank.sections():
             var = tk.IntVar(value=1)
             ttk.Checkbutton(card, text=sec, variable=var).pack(anchor='w', pady=4)
             self.section_vars[sec] = var
@@ -161,7 +199,7 @@ class SmartExamApp(tk.Tk):
         top_row = ttk.Frame(left)
         top_row.pack(fill='x')
         ttk.Label(top_row, text="Section:", font=('Segoe UI', 10)).pack(side='left')
-        self.section_combo = ttk.Combobox(top_row, values=self.sections, state='readonly', width=18)
+        self.section_combo = ttk.Combobox(top_row, values=self.session.sections, state='readonly', width=18)
         self.section_combo.current(0)
         self.section_combo.pack(side='left', padx=(6,12))
         ttk.Button(top_row, text="Switch Section", command=self._switch_section).pack(side='left')
@@ -171,12 +209,14 @@ class SmartExamApp(tk.Tk):
         self.lbl_question = ttk.Label(left, text="", style='Q.TLabel', wraplength=620, justify='left')
         self.lbl_question.pack(anchor='w', pady=(8,10))
 
+        self.lbl_qimage = ttk.Label(left, style='Q.TLabel')  # question diagram, empty when there is none
+        self.lbl_qimage.pack(anchor='w')
+
+        # Option buttons are pooled: grown to the largest question seen, extras hidden
         self.answer_var = tk.IntVar(value=-1)
-        self.opt_buttons = []
-        for i in range(4):
-            rb = ttk.Radiobutton(left, text="", variable=self.answer_var, value=i, style='Opt.TRadiobutton')
-            rb.pack(anchor='w', pady=6)
-            self.opt_buttons.append(rb)
+        self.opts_frame = ttk.Frame(left, style='Card.TFrame')
+        self.opts_frame.pack(fill='x')
+        self.opt_buttons, self._opts_shown = [], 0
 
         action = ttk.Frame(left)
         action.pack(fill='x', pady=(12,0))
@@ -202,7 +242,7 @@ class SmartExamApp(tk.Tk):
         ttk.Separator(right, orient='horizontal').pack(fill='x', pady=8)
         ttk.Label(right, text="Sections", font=('Segoe UI', 10, 'bold')).pack(anchor='w', pady=(6,2))
         self.sections_listbox = tk.Listbox(right, height=5, width=28)
-        for sec in self.sections: self.sections_listbox.insert(tk.END, sec)
+        self._refresh_sections_list()
         self.sections_listbox.selection_set(0)
         self.sections_listbox.pack()
         ttk.Button(right, text="Go to Section", command=self._goto_section_from_list).pack(pady=(6,0))
@@ -216,11 +256,17 @@ class SmartExamApp(tk.Tk):
     # Frame Navigation
     # -----------------------------
     def show_frame(self, name):
+        frame = self._frame(name)
         for widget in self.winfo_children(): widget.place_forget()
-        if name == 'login': self.login_frame.place(relx=0, rely=0, relwidth=1, relheight=1)
-        elif name == 'section_select': self.section_select_frame.place(relx=0, rely=0, relwidth=1, relheight=1)
-        elif name == 'exam': self.exam_frame.place(relx=0, rely=0, relwidth=1, relheight=1)
-        elif name == 'review': self.review_frame.place(relx=0, rely=0, relwidth=1, relheight=1)
+        frame.place(relx=0, rely=0, relwidth=1, relheight=1)
+
+    def _frame(self, name):
+        # 'login' -> self.login_frame, built by _build_login_frame() on first use
+        frame = getattr(self, f"{name}_frame", None)
+        if frame is None:
+            getattr(self, f"_build_{name}_frame")()
+            frame = getattr(self, f"{name}_frame")
+        return frame
 
     # -----------------------------
     # Actions: Login -> Start Exam
@@ -231,8 +277,24 @@ class SmartExamApp(tk.Tk):
         if not name or not roll:
             messagebox.showwarning("Missing", "Please enter both name and roll/ID.")
             return
-        self.student_name = name
-        self.student_roll = roll
+        from journal import ExamJournal
+        self._open_storage()
+        self.session.name, self.session.roll = name, roll
+        self.journal = ExamJournal(JOURNAL_DIR, roll)
+        if self.journal.exists():
+            if messagebox.askyesno("Resume", "An unfinished exam was found for this Roll/ID.\n\nResume it?"):
+                try:
+                    self.session = self.journal.recover(self.bank)
+                except (OSError, ValueError) as e:
+                    # Keep the files: they may be all that is left of the answers
+                    self.journal.close()
+                    self.journal = None
+                    messagebox.showerror("Resume failed", f"The saved exam could not be restored:\n{e}\n\n"
+                                         "It has been kept. Ask the invigilator, or log in again and choose not to resume to start over.")
+                    return
+                self._begin_exam()
+                return
+            self.journal.close(discard=True)
         self.show_frame('section_select')
 
     def _on_section_confirm(self):
@@ -240,19 +302,28 @@ class SmartExamApp(tk.Tk):
         if not selected:
             messagebox.showwarning("Select", "Select at least one section.")
             return
-        self.sections = selected
-        self.current_section = self.sections[0]
         # Reset per-section state
-        self.section_state = {sec: {"current_q":0, "selected":[None]*len(SECTIONS[sec]), "flagged":[False]*len(SECTIONS[sec])} for sec in self.sections}
+        try: paper = make_paper(self.bank, self.session.roll, selected)
+        except ValueError as e:
+            messagebox.showerror("Sections", str(e))
+            return
+        self.session.reset(selected, paper)
+        # Start timer: the deadline is fixed here, ticks only read it
+        self.session.start()
+        self._begin_exam()
+
+    def _begin_exam(self):
+        self._frame('exam')
         # Update combo & sidebar
-        self.section_combo['values'] = self.sections
-        self.section_combo.set(self.current_section)
-        self.sections_listbox.delete(0, tk.END)
-        for sec in self.sections: self.sections_listbox.insert(tk.END, sec)
-        self.progress_bar['maximum'] = len(SECTIONS[self.current_section])
-        # Start timer
-        self.start_time = time.time()
-        self.remaining_seconds = self.duration_seconds
+        self.section_combo['values'] = self.session.sections
+        self.section_combo.set(self.session.current_section)
+        self._refresh_sections_list()
+        self._refresh_flagged_list()
+        self.progress_bar['maximum'] = self.session.count()
+        self.review_rows = None
+        self.journal.begin(self.session)
+        self._tick_due, self._shown_remaining = None, None
+        if self.telemetry: self.telemetry.begin(self.session)
         self.show_frame('exam')
         self._update_question_ui()
         self._tick()
@@ -265,105 +336,195 @@ class SmartExamApp(tk.Tk):
         return f"{int(m):02d}:{int(s):02d}"
 
     def _tick(self):
-        if self.remaining_seconds <= 0:
+        self.timer_job = None
+        now = time.monotonic()
+        if self._tick_due is not None:
+            # Event-loop lag: reported, with late ticks and missed seconds, by telemetry.py
+            lag = max(0.0, now - self._tick_due)
+            if self.telemetry: self.telemetry.record(TICK, self.session.current_section, self.session.current_q, int(lag*1e6))
+        left = self.session.deadline - now
+        if left <= 0:
             self.lbl_timer.config(text="00:00")
             messagebox.showinfo("Time's up", "Time is over. The exam will be submitted automatically.")
             self._submit_exam()
             return
-        # warning if less than 5 minutes
-        if self.remaining_seconds <= 300: self.lbl_timer.config(foreground='red')
-        self.lbl_timer.config(text=self._format_time(self.remaining_seconds))
-        self.remaining_seconds -= 1
-        self.timer_job = self.after(1000, self._tick)
+        remaining = math.ceil(left)
+        if remaining != self._shown_remaining:
+            # warning if less than 5 minutes
+            if remaining <= 300: self.lbl_timer.config(foreground='red')
+            self.lbl_timer.config(text=self._format_time(remaining))
+            self._shown_remaining = remaining
+        # Wake at the next whole-second boundary of the deadline, not 1000ms after this tick
+        delay = left - (remaining - 1)
+        self._tick_due = now + delay
+        if self.journal: self.journal.flush(self.session)
+        if self.telemetry: self.telemetry.flush()
+        self.timer_job = self.after(max(1, math.ceil(delay*1000)), self._tick)
 
     # -----------------------------
     # Question Navigation
     # -----------------------------
+    @timed(SHOW)
     def _update_question_ui(self):
-        sec = self.current_section
-        state = self.section_state[sec]
-        qidx = state['current_q']
-        qdata = SECTIONS[sec][qidx]
+        state = self.session.current
+        qidx = state.current_q
+        qdata = self.session.question()
         self.lbl_question.config(text=qdata['q'])
+        self._show_options(len(qdata['opts']))
         for i, opt in enumerate(qdata['opts']): self.opt_buttons[i].config(text=opt)
-        sel = state['selected'][qidx]
+        self._show_media()
+        sel = state.answer(qidx)
         self.answer_var.set(sel if sel is not None else -1)
-        self.lbl_qcounter.config(text=f"Question {qidx+1} / {len(SECTIONS[sec])}")
-        self.progress_bar['maximum'] = len(SECTIONS[sec])
+        self.lbl_qcounter.config(text=f"Question {qidx+1} (adaptive)" if self.session.adaptive else f"Question {qidx+1} / {state.count}")
+        self.progress_bar['maximum'] = state.count
         self.progress_bar['value'] = qidx+1
-        self.flag_btn.config(text="Unflag" if state['flagged'][qidx] else "Flag for review")
-        self._update_flagged_list()
+        self.flag_btn.config(text="Unflag" if state.is_flagged(qidx) else "Flag for review")
+
+    def _show_options(self, n):
+        while len(self.opt_buttons) < n:
+            self.opt_buttons.append(ttk.Radiobutton(self.opts_frame, text="", variable=self.answer_var, value=len(self.opt_buttons),
+                                                    style='Opt.TRadiobutton', compound='left'))
+        if n == self._opts_shown: return
+        # Hidden buttons are always the tail of the pool, so re-packing keeps their order
+        for i in range(self._opts_shown, n): self.opt_buttons[i].pack(anchor='w', pady=6)
+        for i in range(n, self._opts_shown): self.opt_buttons[i].pack_forget()
+        self._opts_shown = n
 
-    def _record_selection(self):
-        sel = self.answer_var.get()
-        self.section_state[self.current_section]['selected'][self.section_state[self.current_section]['current_q']] = None if sel==-1 else sel
+    # -----------------------------
+    # Question media: only cache lookups here; decoding happens in media.MediaLoader
+    # -----------------------------
+    def _show_media(self):
+        sec, idx = self.session.current_section, self.session.current_q
+        if self.media is None or not self.bank.media_slots(sec):
+            if self._shown_media: self._clear_media()
+            return
+        item = self.session.bank_item(sec, idx)
+        slots = self.media.slots(sec, item)
+        keys = [(sec, item, -1) if -1 in slots else None]
+        keys += [(sec, item, o) if o in slots else None for o in (self.session.bank_option(sec, idx, j) for j in range(self._opts_shown))]
+        shown = [key and self.media.get(key) for key in keys]
+        # A diagram that cannot be shown is said so on screen rather than left out unnoticed
+        broken = any(key and self.media.failed(key) for key in keys)
+        self.lbl_qimage.config(image=shown[0] or '', compound='top', foreground='#c62828',
+                               text="An image for this question could not be shown. Please tell the invigilator." if broken else '')
+        for rb, photo in zip(self.opt_buttons, shown[1:]): rb.config(image=photo or '')
+        # Displayed images stay referenced here even if the cache evicts them
+        self._shown_media = shown
+        self._media_item = (sec, item)
+        for i in (idx+1, idx-1):
+            if 0 <= i < self.session.count(sec):
+                near = self.session.bank_item(sec, i)
+                self.media.prefetch((sec, near, slot) for slot in self.media.slots(sec, near))
+
+    def _clear_media(self):
+        self.lbl_qimage.config(image='', text='')
+        for rb in self.opt_buttons: rb.config(image='')
+        self._shown_media = []
+
+    def _media_ready(self, key):
+        if self._shown_media and key[:2] == self._media_item: self._show_media()
 
+    def _record_selection(self):
+        sel = None if self.answer_var.get()==-1 else self.answer_var.get()
+        state = self.session.current
+        if state.answer(state.current_q) == sel: return
+        self.session.select(sel)
+        if self.journal: self.journal.answer(self.session, state.current_q, sel)
+        self._patch_sections_list(self.session.current_section)
+        self._review_refresh_question(self.session.current_section, state.current_q)
+
+    @timed(NEXT)
     def _next_q(self):
         self._record_selection()
-        sec = self.current_section
-        if self.section_state[sec]['current_q'] < len(SECTIONS[sec])-1:
-            self.section_state[sec]['current_q'] += 1
+        sec, count = self.session.current_section, self.session.count()
+        if self.session.next():
+            if self.session.count() != count:
+                # An adaptive item was drawn; it is journaled with the next tick's flush
+                self._patch_sections_list(sec)
+                self.review_rows = None
+                if self.journal: self.journal.draw(self.session, sec)
             self._update_question_ui()
-        else:
-            messagebox.showinfo("End", "You reached the end of this section.")
+        else: self.after_idle(messagebox.showinfo, "End", self._end_of_section_text())  # modal wait is not handler time
+
+    def _end_of_section_text(self):
+        if not self.session.adaptive: return "You reached the end of this section."
+        if self.session.current.answer(self.session.current_q) is None: return "Choose an answer to continue."
+        return "This section is complete. Move to another section or submit."
 
+    @timed(PREV)
     def _prev_q(self):
         self._record_selection()
-        sec = self.current_section
-        if self.section_state[sec]['current_q'] > 0:
-            self.section_state[sec]['current_q'] -= 1
-            self._update_question_ui()
+        if self.session.prev(): self._update_question_ui()
 
     # -----------------------------
     # Flag Questions
     # -----------------------------
+    @timed(FLAG)
     def _toggle_flag(self):
-        sec = self.current_section
-        idx = self.section_state[sec]['current_q']
-        self.section_state[sec]['flagged'][idx] = not self.section_state[sec]['flagged'][idx]
-        self._update_flagged_list()
-        self.flag_btn.config(text="Unflag" if self.section_state[sec]['flagged'][idx] else "Flag for review")
-
-    def _update_flagged_list(self):
+        sec, idx = self.session.current_section, self.session.current_q
+        flagged = self.session.toggle_flag()
+        if self.journal: self.journal.flag(self.session, idx, flagged)
+        # One insert or delete; the listbox mirrors session.flag_position order
+        pos = self.session.flag_position(sec, idx)
+        if flagged: self.flagged_listbox.insert(pos, self._flagged_display(sec, idx))
+        else: self.flagged_listbox.delete(pos)
+        self.flag_btn.config(text="Unflag" if flagged else "Flag for review")
+
+    def _flagged_display(self, sec, i):
+        qtext = self.session.question(sec, i)['q']
+        return f"{sec} - Q{i+1}: {qtext[:40]}{'...' if len(qtext)>40 else ''}"
+
+    def _refresh_flagged_list(self):
         self.flagged_listbox.delete(0, tk.END)
-        for sec in self.sections:
-            for i, f in enumerate(self.section_state[sec]['flagged']):
-                if f:
-                    qtext = SECTIONS[sec][i]['q']
-                    display = f"{sec} - Q{i+1}: {qtext[:40]}{'...' if len(qtext)>40 else ''}"
-                    self.flagged_listbox.insert(tk.END, display)
+        for sec in self.session.sections:
+            for i in self.session.state[sec].flagged_indices():
+                self.flagged_listbox.insert(tk.END, self._flagged_display(sec, i))
 
     def _jump_to_flagged(self, event):
         sel = self.flagged_listbox.curselection()
         if not sel: return
-        text = self.flagged_listbox.get(sel[0])
-        try:
-            parts = text.split(" - ")
-            sec = parts[0]
-            qnum = int(parts[1].split(":")[0][1:]) - 1
-            if sec in self.sections:
-                self.current_section = sec
-                self.section_combo.set(sec)
-                self.section_state[sec]['current_q'] = qnum
-                self._update_question_ui()
-        except: pass
+        sec, qnum = self.session.flag_at(sel[0])
+        self._record_selection()
+        if self.session.jump(sec, qnum):
+            if self.journal: self.journal.section(self.session)
+            self.section_combo.set(sec)
+            self._update_question_ui()
 
     # -----------------------------
     # Section Switching
     # -----------------------------
+    def _section_display(self, sec):
+        left = self.session.state[sec].unanswered
+        return f"{sec} ({left} unanswered)" if left else f"{sec} (all answered)"
+
+    def _refresh_sections_list(self):
+        self.sections_listbox.delete(0, tk.END)
+        for sec in self.session.sections: self.sections_listbox.insert(tk.END, self._section_display(sec))
+
+    def _patch_sections_list(self, sec):
+        pos = self.session.sections.index(sec)
+        selected = pos in self.sections_listbox.curselection()
+        self.sections_listbox.delete(pos)
+        self.sections_listbox.insert(pos, self._section_display(sec))
+        if selected: self.sections_listbox.selection_set(pos)
+
+    @timed(SECTION)
     def _switch_section(self):
-        sec = self.section_combo.get()
-        if sec in self.sections:
-            self.current_section = sec
+        self._record_selection()
+        if self.session.switch_section(self.section_combo.get()):
+            if self.journal: self.journal.section(self.session)
             self._update_question_ui()
 
+    @timed(SECTION)
     def _goto_section_from_list(self):
         sel = self.sections_listbox.curselection()
         if sel:
-            sec = self.sections_listbox.get(sel[0])
-            self.current_section = sec
-            self.section_combo.set(sec)
-            self._update_question_ui()
+            sec = self.session.sections[sel[0]]
+            self._record_selection()
+            if self.session.switch_section(sec):
+                if self.journal: self.journal.section(self.session)
+                self.section_combo.set(sec)
+                self._update_question_ui()
 
     # -----------------------------
     # Review & Submit
@@ -372,66 +533,136 @@ class SmartExamApp(tk.Tk):
         self.review_frame = ttk.Frame(self, padding=8)
         header = ttk.Label(self.review_frame, text="Review Answers", style='Header.TLabel')
         header.pack(fill='x', pady=(0,8))
-        canvas = tk.Canvas(self.review_frame, borderwidth=0, background='#f7f7f7')
-        frame = ttk.Frame(canvas)
-        vsb = ttk.Scrollbar(self.review_frame, orient='vertical', command=canvas.yview)
-        canvas.configure(yscrollcommand=vsb.set)
-        vsb.pack(side='right', fill='y')
-        canvas.pack(side='left', fill='both', expand=True)
-        canvas.create_window((0,0), window=frame, anchor='nw')
-        frame.bind("<Configure>", lambda e: canvas.configure(scrollregion=canvas.bbox("all")))
-        self.review_container = frame
         bottom = ttk.Frame(self.review_frame)
-        bottom.pack(fill='x', pady=(8,0))
+        bottom.pack(side='bottom', fill='x', pady=(8,0))
         ttk.Button(bottom, text="Save Results to CSV", command=self._save_results_prompt).pack(side='left')
         ttk.Button(bottom, text="Back to Exam", command=lambda: self.show_frame('exam')).pack(side='right')
+        # Only the rows in view exist as widgets; they are re-bound as the list scrolls
+        self.review_vsb = ttk.Scrollbar(self.review_frame, orient='vertical', command=self._review_yview)
+        self.review_vsb.pack(side='right', fill='y')
+        self.review_view = tk.Frame(self.review_frame, background='#f7f7f7')
+        self.review_view.pack(side='left', fill='both', expand=True)
+        self.review_view.bind("<Configure>", lambda e: self._review_render())
+        for seq in ("<MouseWheel>", "<Button-4>", "<Button-5>"): self.review_view.bind_all(seq, self._review_wheel, add='+')
+
+    def _review_visible(self):
+        return max(1, self.review_view.winfo_height() // REVIEW_ROW_HEIGHT)
+
+    def _review_yview(self, *args):
+        if not self.review_rows: return
+        visible = self._review_visible()
+        if args[0] == 'moveto': top = int(float(args[1]) * self.review_rows.total)
+        else: top = self.review_top + int(args[1]) * (visible if args[2] == 'pages' else 1)
+        self.review_top = max(0, min(top, self.review_rows.total - visible))
+        self._review_render()
+
+    def _review_wheel(self, event):
+        if not self.review_frame.winfo_ismapped(): return
+        step = -1 if getattr(event, 'num', 0) == 4 or getattr(event, 'delta', 0) > 0 else 1
+        self._review_yview('scroll', step*3, 'units')
+
+    def _review_render(self, only=None):
+        rows = self.review_rows
+        if rows is None: return
+        visible = self._review_visible() + 1
+        while len(self.review_pool) < visible:
+            self.review_pool.append(ttk.Label(self.review_view))
+        width = self.review_view.winfo_width()
+        for k, label in enumerate(self.review_pool):
+            r = self.review_top + k
+            if k >= visible or r >= rows.total: label.place_forget(); continue
+            if only is not None and r not in only: continue
+            self._review_bind_row(label, *rows.locate(r))
+            label.place(x=0, y=k*REVIEW_ROW_HEIGHT, width=width, height=REVIEW_ROW_HEIGHT)
+        self.review_vsb.set(self.review_top / max(1, rows.total), min(1.0, (self.review_top + visible - 1) / max(1, rows.total)))
+
+    def _review_bind_row(self, label, sec, i, j):
+        if i is None:
+            label.config(text=f"Section: {sec}", font=('Segoe UI', 11, 'bold'), foreground='#000', padding=(6,0))
+            return
+        q = self.session.question(sec, i)
+        if j is None:
+            label.config(text=f"Q{i+1}. {q['q']}", font=('Segoe UI', 10, 'bold'), foreground='#000', padding=(6,0))
+            return
+        user, correct = self.session.state[sec].answer(i), q['a']
+        prefix, fg = "   ", "#000"
+        if accepts(correct, j): prefix, fg = "✔ ", "#2e7d32"
+        if user is not None and j==user and not accepts(correct, user): prefix, fg = "✖ ", "#c62828"
+        label.config(text=f"{prefix}{q['opts'][j]}", font=('Segoe UI', 10), foreground=fg, padding=(14,0))
+
+    def _review_refresh_question(self, sec, i):
+        # Patch just this question's rows if they are on screen
+        if self.review_rows is not None and self.review_rows.fits(self.session):
+            self._review_render(only=self.review_rows.question_rows(sec, i))
 
     def _open_review(self):
-        for w in self.review_container.winfo_children(): w.destroy()
-        for sec in self.sections:
-            frame = ttk.Frame(self.review_container, style='Card.TFrame', padding=8)
-            frame.pack(fill='x', padx=6, pady=6)
-            ttk.Label(frame, text=f"Section: {sec}", font=('Segoe UI', 11, 'bold')).pack(anchor='w')
-            state = self.section_state[sec]
-            for i, q in enumerate(SECTIONS[sec]):
-                user = state['selected'][i]
-                correct = q['a']
-                ttk.Label(frame, text=f"Q{i+1}. {q['q']}", font=('Segoe UI', 10, 'bold')).pack(anchor='w', pady=(6,0))
-                for j, opt in enumerate(q['opts']):
-                    prefix, fg = "   ", "#000"
-                    if j==correct: prefix, fg = "✔ ", "#2e7d32"
-                    if user is not None and j==user and user!=correct: prefix, fg = "✖ ", "#c62828"
-                    ttk.Label(frame, text=f"{prefix}{opt}", foreground=fg).pack(anchor='w', padx=8)
+        if self.review_rows is None or not self.review_rows.fits(self.session):
+            self.review_rows, self.review_top = ReviewRows(self.session), 0
         self.show_frame('review')
+        self._review_render()
 
     def _submit_exam(self):
+        from results import result_rows
+        from responses import pack_submission
         self._record_selection()
         if self.timer_job: self.after_cancel(self.timer_job); self.timer_job=None
-        per_section_scores = {}
-        total_score, total_questions = 0,0
-        for sec in self.sections:
-            score = sum(1 for i,q in enumerate(SECTIONS[sec]) if self.section_state[sec]['selected'][i]==q['a'])
-            per_section_scores[sec] = (score, len(SECTIONS[sec]))
-            total_score += score
-            total_questions += len(SECTIONS[sec])
-        time_taken = time.time() - (self.start_time if self.start_time else time.time())
-        save_results_csv(self.student_name, self.student_roll, per_section_scores, total_score, total_questions, time_taken)
+        per_section_scores, total_score, total_questions = self.session.scores(MARKS_PER_CORRECT, NEGATIVE_MARKS)
+        time_taken = self.session.time_taken()
+        rows = result_rows(self.session.name, self.session.roll, per_section_scores, total_score, total_questions, time_taken)
+        # The journal is only discarded once the results are safely on disk
+        journal, self.journal = self.journal, None
+        if journal: journal.close()
+        if self.telemetry:
+            self.telemetry.record(SUBMIT, self.session.current_section, self.session.current_q)
+            self.telemetry.close()
         pct = int((total_score/total_questions)*100 if total_questions>0 else 0)
-        msg = f"Exam submitted.\n\nName: {self.student_name}\nRoll: {self.student_roll}\nTotal Score: {total_score}/{total_questions}\nPercentage: {pct}%\nTime taken: {int(time_taken)}s\n\nResults saved to {RESULTS_CSV}\n\nOpen review?"
-        if messagebox.askyesno("Submitted", msg): self._open_review()
+        summary = f"Name: {self.session.name}\nRoll: {self.session.roll}\nTotal Score: {total_score}/{total_questions}\nPercentage: {pct}%\nTime taken: {int(time_taken)}s"
+        # Nothing is confirmed until the writer has the rows on disk
+        self.lbl_timer.config(text="Saving…")
+        # Standings come back from the writer thread, which holds the store's lock while it commits
+        responses, rank = pack_submission(self.session), (per_section_scores, total_score)
+        self._watch_save(self.results_writer.submit(rows, responses, rank), rows, responses, rank, journal, summary)
+
+    def _standings_text(self, standings):
+        if standings is None: return "Rank unavailable."
+        return "\n".join(f"{sec}: rank {st['rank']} of {st['of']}, percentile {st['percentile']}" for sec, st in standings.items())
+
+    def _watch_save(self, fut, rows, responses, rank, journal, summary):
+        # Poll the writer's future from the Tk loop; never block on disk I/O here
+        if not fut.done(): self.after(100, self._watch_save, fut, rows, responses, rank, journal, summary); return
+        if fut.exception():
+            # A failed save wrote nothing, so the same rows can go again; the kept journal lets the exam be resumed
+            if messagebox.askretrycancel("Save failed", f"Could not save results to {RESULTS_CSV}:\n{fut.exception()}"):
+                self._watch_save(self.results_writer.submit(rows, responses, rank), rows, responses, rank, journal, summary)
+            else:
+                messagebox.showinfo("Not saved", "The exam has been kept. Log in again with the same Roll/ID to resume and submit it.")
+                self._reset_to_login()
+            return
+        if journal: journal.close(discard=True)
+        if messagebox.askyesno("Submitted", f"Exam submitted.\n\n{summary}\n\n{self._standings_text(fut.result())}\n\nResults saved to {RESULTS_CSV}\n\nOpen review?"): self._open_review()
         else: messagebox.showinfo("Saved", f"Results saved to {RESULTS_CSV}."); self._reset_to_login()
 
     def _save_results_prompt(self): messagebox.showinfo("Saved", f"Results are in {RESULTS_CSV}")
 
     def _reset_to_login(self):
         if self.timer_job: self.after_cancel(self.timer_job); self.timer_job=None
-        self.student_name, self.student_roll = "", ""
+        self.session.name, self.session.roll = "", ""
         self.entry_name.delete(0, tk.END)
         self.entry_roll.delete(0, tk.END)
-        self.section_state = {sec: {"current_q":0, "selected":[None]*len(SECTIONS[sec]), "flagged":[False]*len(SECTIONS[sec])} for sec in self.sections}
-        self.remaining_seconds = self.duration_seconds
+        self.session.reset(self.session.sections)
+        self.review_rows = None
+        self._refresh_sections_list()
+        self._refresh_flagged_list()
         self.show_frame('login')
 
+    def destroy(self):
+        if self.journal: self.journal.close()
+        if self.telemetry: self.telemetry.close()
+        if self.media: self.media.close()
+        if self.results_writer: self.results_writer.close(timeout=5)
+        if self.results_store: self.results_store.close()
+        super().destroy()
+
     def _show_instructions(self):
         messagebox.showinfo("Instructions", "1. Fill name and roll.\n2. Select sections.\n3. Switch sections via dropdown or sidebar.\n4. Flag questions to review.\n5. Timer is shared across sections. Good luck!")
 
@@ -442,5 +673,27 @@ def main():
     app = SmartExamApp()
     app.mainloop()
 
+def serve(argv=None):
+    # Headless multi-candidate server: python smartexam.py --serve [--host H] [--port P]
+    import argparse, asyncio
+    from server import ExamServer, serve_forever, DEFAULT_HOST, DEFAULT_PORT
+    from results import ResultsWriter, ResultsStore
+    from responses import ResponseLog
+    ap = argparse.ArgumentParser(prog="smartexam.py --serve")
+    ap.add_argument("--host", default=DEFAULT_HOST)
+    ap.add_argument("--port", type=int, default=DEFAULT_PORT)
+    args = ap.parse_args(argv)
+    store = ResultsStore(RESULTS_DB)
+    writer = ResultsWriter(RESULTS_CSV, fsync=RESULTS_FSYNC, store=store, response_log=ResponseLog(RESPONSES_DIR))
+    writer.start()
+    adaptive = ADAPTIVE and {"min_items": ADAPTIVE_MIN_ITEMS, "max_items": ADAPTIVE_MAX_ITEMS, "target_se": ADAPTIVE_TARGET_SE}
+    server = ExamServer(open_question_bank(), writer, EXAM_DURATION_MINUTES*60, MARKS_PER_CORRECT, NEGATIVE_MARKS,
+                        PAPER_QUESTIONS_PER_SECTION if SHUFFLE_PAPERS else False, PAPER_SEED, adaptive or None)
+    try: asyncio.run(serve_forever(server, args.host, args.port, ready=lambda addr: print(f"SmartExam server on {addr[0]}:{addr[1]}", flush=True)))
+    except KeyboardInterrupt: pass
+    finally: writer.close(); store.close()
+
 if __name__=="__main__":
-    main()
+    import sys
+    if "--serve" in sys.argv[1:]: serve([a for a in sys.argv[1:] if a != "--serve"])
+    else: main()
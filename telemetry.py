@@ -0,0 +1,180 @@
+# SmartExam — Interaction telemetry (timestamped UI events in a ring buffer, flushed in batches)
+# python telemetry.py telemetry/*.sxt --out telemetry_report
+import functools, os, struct, sys, time
+from collections import defaultdict
+# The app imports this before its first paint; everything else is imported where it is used
+
+NEXT, PREV, FLAG, SECTION, SHOW, TICK, SUBMIT = range(1, 8)
+KIND_NAMES = {NEXT: "next", PREV: "prev", FLAG: "flag", SECTION: "section", SHOW: "show", TICK: "timer_lag"}
+MAGIC = b"SXT1"
+RING_SIZE = 4096  # events held between flushes; a full ring is flushed on the spot
+LATE_TICK_US = 100_000  # a timer tick this far behind schedule counts as late
+
+# ns since the exam began, kind, section number, question number, handler duration (or timer lag) in µs
+_REC = struct.Struct("<qBHII")
+_LEN = struct.Struct("<I")
+
+# -----------------------------
+# Recorder
+# -----------------------------
+class TelemetryRecorder:
+    __slots__ = ("directory", "capacity", "path", "_ring", "_view", "_written", "_flushed", "_file", "_section_no", "_t0")
+
+    def __init__(self, directory, capacity=RING_SIZE):
+        self.directory, self.capacity, self.path = directory, capacity, None
+        self._ring = bytearray(capacity * _REC.size)  # allocated once; record() only packs into it
+        self._view = memoryview(self._ring)
+        self._written = self._flushed = 0
+        self._file = None
+        self._section_no = {}
+        self._t0 = 0
+
+    def begin(self, session):
+        import hashlib, json
+        os.makedirs(self.directory, exist_ok=True)
+        key = hashlib.sha1(session.roll.encode('utf-8')).hexdigest()[:20]
+        self.path = os.path.join(self.directory, f"{time.strftime('%Y%m%d-%H%M%S')}-{key}.sxt")
+        paper = session.paper
+        # Display positions map back to bank items, so shuffled papers aggregate per question
+        # (adaptive papers are drawn as the exam goes, so those stay per position)
+        meta = {"roll": session.roll, "sections": session.sections, "started": time.time(),
+                "items": [list(paper.items[sec]) if paper and not paper.adaptive else None for sec in session.sections]}
+        head = json.dumps(meta).encode('utf-8')
+        self._file = open(self.path, 'wb')
+        self._file.write(MAGIC + _LEN.pack(len(head)) + head)
+        self._section_no = {sec: i for i, sec in enumerate(session.sections)}
+        self._written = self._flushed = 0
+        self._t0 = time.perf_counter_ns()
+
+    def record(self, kind, sec, idx, micros=0, now=None):
+        if self._file is None: return
+        if self._written - self._flushed == self.capacity: self.flush()
+        _REC.pack_into(self._ring, self._written % self.capacity * _REC.size, (now or time.perf_counter_ns()) - self._t0,
+                       kind, self._section_no.get(sec, 0xFFFF), idx, min(micros, 0xFFFFFFFF))
+        self._written += 1
+
+    def flush(self):
+        pending = self._written - self._flushed
+        if self._file is None or not pending: return
+        start = self._flushed % self.capacity * _REC.size
+        end = start + pending * _REC.size
+        if end <= len(self._ring): self._file.write(self._view[start:end])
+        else: self._file.write(self._view[start:]); self._file.write(self._view[:end - len(self._ring)])
+        self._file.flush()
+        self._flushed = self._written
+
+    def close(self):
+        if self._file is None: return
+        self.flush()
+        self._file.close(); self._file = None
+
+def timed(kind):
+    # App handler decorator: one event per call, carrying the handler's own run time
+    def wrap(handler):
+        @functools.wraps(handler)
+        def timed_handler(app, *args):
+            t0 = time.perf_counter_ns()
+            try: return handler(app, *args)
+            finally:
+                if app.telemetry is not None:
+                    now = time.perf_counter_ns()
+                    app.telemetry.record(kind, app.session.current_section, app.session.current_q, (now - t0) // 1000, now)
+        return timed_handler
+    return wrap
+
+# -----------------------------
+# Reading
+# -----------------------------
+def read_log(path):
+    import json
+    with open(path, 'rb') as f: data = f.read()
+    if data[:4] != MAGIC: raise ValueError("not a SmartExam telemetry log")
+    (n,) = _LEN.unpack_from(data, 4)
+    meta = json.loads(data[8:8+n])
+    body = data[8+n:]
+    return meta, _REC.iter_unpack(body[:len(body) - len(body) % _REC.size])  # a torn final record is dropped
+
+# Latency histogram: exact below 64 µs, then 32 buckets per power of two (~3% wide)
+def _bucket(us):
+    if us < 64: return us
+    e = us.bit_length() - 6
+    return 64 + (e - 1) * 32 + (us >> e) - 32
+
+def _bucket_floor(b):
+    if b < 64: return b
+    e, m = divmod(b - 64, 32)
+    return (m + 32) << (e + 1)
+
+def percentile(hist, q):
+    total = sum(hist.values())
+    seen = 0
+    for b in sorted(hist):
+        seen += hist[b]
+        if seen >= q * total: return _bucket_floor(b)
+    return 0
+
+def summarize(paths):
+    dwell = defaultdict(list)                 # (section, item) -> seconds per candidate
+    visits = defaultdict(int)
+    latency = defaultdict(lambda: defaultdict(int))
+    timer = {"ticks": 0, "late": 0, "missed": 0, "max_lag": 0}  # exam timer lag, exact rather than bucketed
+    for path in paths:
+        meta, events = read_log(path)
+        sections, items = meta["sections"], meta["items"]
+        def key(sec_no, q): return sections[sec_no], (items[sec_no][q] if items[sec_no] else q)
+        seen, shown = defaultdict(float), None
+        for t, kind, sec_no, q, us in events:
+            if kind in KIND_NAMES: latency[KIND_NAMES[kind]][_bucket(us)] += 1
+            if kind == TICK:
+                timer["ticks"] += 1
+                timer["late"] += us > LATE_TICK_US
+                timer["missed"] += us // 1_000_000  # whole seconds the countdown never showed
+                timer["max_lag"] = max(timer["max_lag"], us)
+            if kind in (SHOW, SUBMIT) and shown is not None:
+                seen[shown[0]] += (t - shown[1]) / 1e9
+                shown = None
+            if kind == SHOW and sec_no < len(sections):
+                k = key(sec_no, q)
+                visits[k] += 1
+                shown = (k, t)
+        for k, s in seen.items(): dwell[k].append(s)
+    return dwell, visits, latency, timer
+
+def write_reports(out, dwell, visits, latency, timer):
+    import csv
+    os.makedirs(out, exist_ok=True)
+    with open(os.path.join(out, "dwell.csv"), 'w', newline='', encoding='utf-8') as f:
+        w = csv.writer(f)
+        w.writerow(["Section", "Item", "Candidates", "Visits", "MeanSeconds", "MedianSeconds"])
+        for (sec, item), secs in sorted(dwell.items()):
+            secs.sort()
+            w.writerow([sec, item+1, len(secs), visits[sec, item], f"{sum(secs)/len(secs):.2f}", f"{secs[len(secs)//2]:.2f}"])
+    with open(os.path.join(out, "latency.csv"), 'w', newline='', encoding='utf-8') as f:
+        w = csv.writer(f)
+        w.writerow(["Handler", "Events", "P50Micros", "P99Micros", "MaxMicros"])
+        for name, hist in sorted(latency.items()):
+            w.writerow([name, sum(hist.values()), percentile(hist, 0.5), percentile(hist, 0.99), _bucket_floor(max(hist))])
+    with open(os.path.join(out, "latency_histogram.csv"), 'w', newline='', encoding='utf-8') as f:
+        w = csv.writer(f)
+        w.writerow(["Handler", "FromMicros", "Events"])
+        for name, hist in sorted(latency.items()):
+            for b in sorted(hist): w.writerow([name, _bucket_floor(b), hist[b]])
+    with open(os.path.join(out, "timer.csv"), 'w', newline='', encoding='utf-8') as f:
+        w = csv.writer(f)
+        w.writerow(["Ticks", "LateTicks", "MissedSeconds", "MaxLagMicros"])
+        w.writerow([timer["ticks"], timer["late"], timer["missed"], timer["max_lag"]])
+
+def main(argv=None):
+    import argparse
+    ap = argparse.ArgumentParser(prog="telemetry.py")
+    ap.add_argument("logs", nargs="+", help="telemetry logs (.sxt)")
+    ap.add_argument("--out", default="telemetry_report")
+    args = ap.parse_args(argv)
+    dwell, visits, latency, timer = summarize(args.logs)
+    write_reports(args.out, dwell, visits, latency, timer)
+    print(f"{len(args.logs)} logs, {len(dwell)} questions, {sum(sum(h.values()) for h in latency.values())} timed events, "
+          f"{timer['late']} late timer ticks -> {args.out}/")
+    return 0
+
+if __name__=="__main__":
+    sys.exit(main())
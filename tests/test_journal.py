@@ -0,0 +1,64 @@
+# SmartExam — Crash-recovery journal replay
+# python -m pytest tests
+import os, sys
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from config import SECTIONS
+from questionbank import QuestionBank
+from session import ExamSession
+from journal import ExamJournal
+
+def started(bank, duration=10):
+    session = ExamSession(bank, ["Aptitude", "Coding"], duration, "Asha", "R1")
+    session.start()
+    return session
+
+def idle(session, seconds):
+    # Move the session's clock on without sleeping
+    session.start_time -= seconds; session.deadline -= seconds
+
+def test_replays_answers_flags_and_position(tmp_path):
+    bank = QuestionBank.from_sections(SECTIONS)
+    session = started(bank)
+    journal = ExamJournal(str(tmp_path), "R1"); journal.begin(session)
+    session.select(2); journal.answer(session, 0, 2)
+    session.jump("Coding", 3); journal.section(session)
+    journal.flag(session, 3, session.toggle_flag())
+    journal.flush(session); journal.close()
+
+    restored = ExamJournal(str(tmp_path), "R1").recover(bank)
+    assert restored.state["Aptitude"].answer(0) == 2
+    assert restored.state["Coding"].is_flagged(3)
+    assert (restored.current_section, restored.current_q) == ("Coding", 3)
+
+def test_idle_time_is_not_refunded(tmp_path):
+    bank = QuestionBank.from_sections(SECTIONS)
+    session = started(bank)
+    journal = ExamJournal(str(tmp_path), "R1"); journal.begin(session)
+    session.select(1); journal.answer(session, 0, 1); journal.flush(session)
+    for _ in range(6):  # one flush per timer tick, nothing else happening
+        idle(session, 1); journal.flush(session)
+    # The app is killed here, without close()
+    restored = ExamJournal(str(tmp_path), "R1").recover(bank)
+    assert restored.remaining_seconds <= 10 - 6 + 2
+    assert restored.state["Aptitude"].answer(0) == 1
+
+def test_replays_adaptive_draws_logged_after_the_snapshot(tmp_path):
+    from adaptive import AdaptivePaper
+    sections = {"A": [{"q": f"A{i}?", "opts": ["a", "b", "c", "d"], "a": 0, "irt": [1.0, (i - 10) / 5, 0.1]} for i in range(20)]}
+    bank = QuestionBank.from_sections(sections)
+    paper = AdaptivePaper(bank, "R1", ["A"], min_items=3, max_items=10, target_se=0.01)
+    session = ExamSession(bank, ["A"], 60, "Asha", "R1", paper)
+    session.start()
+    journal = ExamJournal(str(tmp_path), "R1"); journal.begin(session)
+    for opt in (0, 1, 0):
+        session.select(opt); journal.answer(session, session.current_q, opt)
+        assert session.next()
+        journal.draw(session, "A")
+    journal.flush(session)  # killed here: the snapshot still holds only the first item
+
+    restored = ExamJournal(str(tmp_path), "R1").recover(bank)
+    assert list(restored.paper.items["A"]) == list(paper.items["A"])
+    assert list(restored.state["A"].selected) == list(session.state["A"].selected)
+    assert restored.next() is False  # the newest item is unanswered, so nothing more is drawn yet
+    restored.select(1)
+    assert restored.next() and restored.paper.items["A"][-1] not in paper.items["A"][:-1]
@@ -0,0 +1,36 @@
+# SmartExam — Review screen row layout
+# python -m pytest tests
+import os, sys
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from questionbank import QuestionBank
+from session import ExamSession
+from adaptive import AdaptivePaper
+from smartexam import ReviewRows
+
+def adaptive_session():
+    sections = {sec: [{"q": f"{sec}{i}?", "opts": ["a", "b", "c", "d"][:2 + i % 3], "a": 0, "irt": [1.0, (i - 10) / 5, 0.1]}
+                      for i in range(20)] for sec in ("A", "B")}
+    bank = QuestionBank.from_sections(sections)
+    paper = AdaptivePaper(bank, "R1", ["A", "B"], min_items=3, max_items=10, target_se=0.01)
+    return ExamSession(bank, ["A", "B"], paper=paper, roll="R1")
+
+def test_rows_cover_every_question_and_option():
+    session = adaptive_session()
+    rows = ReviewRows(session)
+    assert rows.fits(session)
+    assert rows.total == sum(1 + sum(1 + n for n in session.option_counts(sec)) for sec in session.sections)
+    for sec in session.sections:
+        for i in range(session.count(sec)):
+            span = rows.question_rows(sec, i)
+            assert rows.locate(span[0]) == (sec, i, None)
+            assert len(span) == 1 + session.option_counts(sec)[i]
+
+def test_stale_after_adaptive_section_grows():
+    session = adaptive_session()
+    rows = ReviewRows(session)
+    session.select(0)
+    assert session.next() and session.count("A") == 2
+    assert not rows.fits(session)
+    rows = ReviewRows(session)
+    assert rows.fits(session)
+    assert list(rows.question_rows("A", 1)) == list(range(rows.question_starts["A"][1], rows.section_starts[1]))